@@ -0,0 +1,63 @@
+"""Benchmark the memory, query and add time of the near-duplicate index.
+
+Usage:
+    poetry run python benchmarks/near_duplicates.py [RECORDS ...]
+"""
+
+import random
+import sys
+import tracemalloc
+from time import perf_counter
+
+from image_processing_function_app.perceptual_hash import NearDuplicateIndex
+
+RECORDS_DEFAULT = [200_000, 1_000_000]
+MAX_DISTANCES = [4, 10, 16]
+QUERIES = 100
+
+
+def benchmark(records: int):
+    """Prints the memory and query time of an index of random hashes."""
+    rng = random.Random(0)
+    hashes = [rng.getrandbits(64) for _ in range(records)]
+
+    tracemalloc.start()
+    start = perf_counter()
+    index = NearDuplicateIndex()
+    for i, perceptual_hash in enumerate(hashes):
+        index.add(f"{i:08d}.jpg", perceptual_hash)
+    # The first search builds the lookup tables of the index
+    index.search(hashes[0], max_distance=0)
+    build_time = perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{records} records: {memory / 1024 / 1024:.1f} MiB, {build_time:.1f} s build"
+    )
+    for max_distance in MAX_DISTANCES:
+        # Query near-duplicates of indexed hashes, so each query has results
+        queries = [
+            hashes[rng.randrange(records)] ^ (1 << rng.randrange(64))
+            for _ in range(QUERIES)
+        ]
+        start = perf_counter()
+        for query in queries:
+            index.search(query, max_distance=max_distance)
+        elapsed = (perf_counter() - start) / QUERIES
+        print(f"  max distance {max_distance:>2}: {elapsed * 1000:7.2f} ms per query")
+
+    # Each request adds its hash and searches, which compares the unsorted tail until
+    # it is merged into the lookup tables
+    start = perf_counter()
+    for i in range(QUERIES):
+        perceptual_hash = rng.getrandbits(64)
+        index.search(perceptual_hash, max_distance=MAX_DISTANCES[0])
+        index.add(f"new{i:05d}.jpg", perceptual_hash)
+    elapsed = (perf_counter() - start) / QUERIES
+    print(f"  add and search: {elapsed * 1000:7.2f} ms per request")
+
+
+if __name__ == "__main__":
+    for records in [int(arg) for arg in sys.argv[1:]] or RECORDS_DEFAULT:
+        benchmark(records)
@@ -0,0 +1,46 @@
+"""Benchmark the CPU cost per MB of image optimization against the bytes saved.
+
+Usage:
+    poetry run python benchmarks/optimization.py [IMAGE ...]
+"""
+
+import sys
+from time import process_time
+
+from image_processing_function_app.optimization import optimize_image
+
+SETTINGS = [
+    ("jpeg keep", None, None),
+    ("jpeg q85", "JPEG", 85),
+    ("jpeg q75", "JPEG", 75),
+    ("webp q75", "WEBP", 75),
+]
+ROUNDS = 20
+
+
+def benchmark(path: str):
+    """Prints the CPU cost and bytes saved for each optimization setting."""
+    with open(path, "rb") as f:
+        binary_image = f.read()
+
+    megabytes = len(binary_image) / 1024 / 1024
+    print(f"{path} ({len(binary_image)} bytes)")
+    for name, image_format, quality in SETTINGS:
+        start = process_time()
+        for _ in range(ROUNDS):
+            result = optimize_image(
+                binary_image=binary_image,
+                image_format=image_format,
+                quality=quality,
+            )
+        cpu_seconds = (process_time() - start) / ROUNDS
+        saved = result.original_size - result.stored_size
+        print(
+            f"  {name:<10} {cpu_seconds / megabytes * 1000:8.1f} ms CPU/MB"
+            f" {saved:>10} bytes saved ({saved / result.original_size:6.1%})"
+        )
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:] or ["tests/resources/car.jpg"]:
+        benchmark(path)
@@ -1,11 +1,41 @@
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Iterator, Optional
 
-from azure.data.tables import TableServiceClient, UpdateMode
-from azure.storage.blob import BlobServiceClient
+from azure.core.exceptions import ResourceNotFoundError
+from azure.data.tables import TableEntity, TableServiceClient, UpdateMode
+from azure.storage.blob import BlobBlock, BlobServiceClient
 
 from image_processing_function_app.exceptions import BlobStorageError, TableStorageError
 
 
+@lru_cache(maxsize=None)
+def get_blob_service_client(connection_string: str) -> BlobServiceClient:
+    """Returns a BlobServiceClient, which is created once per connection
+    string.
+
+    Args:
+        connection_string (str): The connection string for the Azure Storage account.
+
+    Returns:
+        BlobServiceClient: The client for the Azure Storage account.
+    """
+    return BlobServiceClient.from_connection_string(conn_str=connection_string)
+
+
+@lru_cache(maxsize=None)
+def get_table_service_client(connection_string: str) -> TableServiceClient:
+    """Returns a TableServiceClient, which is created once per connection
+    string.
+
+    Args:
+        connection_string (str): The connection string for the Azure Storage account.
+
+    Returns:
+        TableServiceClient: The client for the Azure Storage account.
+    """
+    return TableServiceClient.from_connection_string(conn_str=connection_string)
+
+
 def upload_to_blob_storage(
     connection_string: str,
     container_name: str,
@@ -27,9 +57,7 @@ def upload_to_blob_storage(
         BlobStorageError: An error occurred while uploading the data to Azure Blob Storage.
     """
     try:
-        blob_service_client = BlobServiceClient.from_connection_string(
-            conn_str=connection_string
-        )
+        blob_service_client = get_blob_service_client(connection_string)
         blob_client = blob_service_client.get_blob_client(
             container=container_name, blob=blob_file_name
         )
@@ -40,6 +68,199 @@ def upload_to_blob_storage(
         raise BlobStorageError(e) from e
 
 
+def stage_blob_block(
+    connection_string: str,
+    container_name: str,
+    blob_file_name: str,
+    block_id: str,
+    data: bytes,
+    **kwargs: Any,
+):
+    """Stages a block of a blob in Azure Blob Storage, the block is not
+    committed.
+
+    Args:
+        connection_string (str): The connection string for the Azure Storage account.
+        container_name (str): The name of the container.
+        blob_file_name (str): The name of the blob.
+        block_id (str): The id of the block, all block ids of a blob must have the same length.
+        data (bytes): The data of the block.
+
+    Raises:
+        BlobStorageError: An error occurred while staging the block in Azure Blob Storage.
+    """
+    try:
+        blob_service_client = get_blob_service_client(connection_string)
+        blob_client = blob_service_client.get_blob_client(
+            container=container_name, blob=blob_file_name
+        )
+        blob_client.stage_block(block_id=block_id, data=data, **kwargs)
+    except Exception as e:
+        raise BlobStorageError(e) from e
+
+
+def get_blob_block_list(
+    connection_string: str,
+    container_name: str,
+    blob_file_name: str,
+    **kwargs: Any,
+) -> tuple[list[BlobBlock], list[BlobBlock]]:
+    """Gets the committed and uncommitted blocks of a blob in Azure Blob
+    Storage.
+
+    Args:
+        connection_string (str): The connection string for the Azure Storage account.
+        container_name (str): The name of the container.
+        blob_file_name (str): The name of the blob.
+
+    Raises:
+        BlobStorageError: An error occurred while getting the blocks from Azure Blob Storage.
+
+    Returns:
+        tuple[list[BlobBlock], list[BlobBlock]]: The committed and uncommitted blocks, empty when
+            the blob does not exist.
+    """
+    try:
+        blob_service_client = get_blob_service_client(connection_string)
+        blob_client = blob_service_client.get_blob_client(
+            container=container_name, blob=blob_file_name
+        )
+        return blob_client.get_block_list(block_list_type="all", **kwargs)
+    except ResourceNotFoundError:
+        return [], []
+    except Exception as e:
+        raise BlobStorageError(e) from e
+
+
+def commit_blob_block_list(
+    connection_string: str,
+    container_name: str,
+    blob_file_name: str,
+    block_ids: list[str],
+    metadata: Optional[dict[Any, Any]] = None,
+    **kwargs: Any,
+):
+    """Commits the blocks of a blob in Azure Blob Storage, in the order of the
+    block ids.
+
+    Args:
+        connection_string (str): The connection string for the Azure Storage account.
+        container_name (str): The name of the container.
+        blob_file_name (str): The name of the blob.
+        block_ids (list[str]): The ids of the blocks that make up the blob.
+        metadata (dict, optional): The metadata to associate with the blob. Defaults to None.
+
+    Raises:
+        BlobStorageError: An error occurred while committing the blocks in Azure Blob Storage.
+    """
+    try:
+        blob_service_client = get_blob_service_client(connection_string)
+        blob_client = blob_service_client.get_blob_client(
+            container=container_name, blob=blob_file_name
+        )
+        blob_client.commit_block_list(
+            block_list=[BlobBlock(block_id=block_id) for block_id in block_ids],
+            metadata=metadata,
+            **kwargs,
+        )
+    except Exception as e:
+        raise BlobStorageError(e) from e
+
+
+def download_blob_range(
+    connection_string: str,
+    container_name: str,
+    blob_file_name: str,
+    offset: int,
+    length: int,
+    **kwargs: Any,
+) -> bytes:
+    """Downloads a range of bytes of a blob from Azure Blob Storage.
+
+    Args:
+        connection_string (str): The connection string for the Azure Storage account.
+        container_name (str): The name of the container.
+        blob_file_name (str): The name of the blob.
+        offset (int): The offset of the first byte.
+        length (int): The number of bytes.
+
+    Raises:
+        BlobStorageError: An error occurred while downloading the blob from Azure Blob Storage.
+
+    Returns:
+        bytes: The downloaded bytes.
+    """
+    try:
+        blob_service_client = get_blob_service_client(connection_string)
+        blob_client = blob_service_client.get_blob_client(
+            container=container_name, blob=blob_file_name
+        )
+        return blob_client.download_blob(
+            offset=offset, length=length, **kwargs
+        ).readall()
+    except Exception as e:
+        raise BlobStorageError(e) from e
+
+
+def set_blob_metadata(
+    connection_string: str,
+    container_name: str,
+    blob_file_name: str,
+    metadata: dict[Any, Any],
+    **kwargs: Any,
+):
+    """Sets the metadata of a blob in Azure Blob Storage.
+
+    Args:
+        connection_string (str): The connection string for the Azure Storage account.
+        container_name (str): The name of the container.
+        blob_file_name (str): The name of the blob.
+        metadata (dict): The metadata to associate with the blob.
+
+    Raises:
+        BlobStorageError: An error occurred while setting the metadata in Azure Blob Storage.
+    """
+    try:
+        blob_service_client = get_blob_service_client(connection_string)
+        blob_client = blob_service_client.get_blob_client(
+            container=container_name, blob=blob_file_name
+        )
+        blob_client.set_blob_metadata(metadata=metadata, **kwargs)
+    except Exception as e:
+        raise BlobStorageError(e) from e
+
+
+def get_blob_metadata(
+    connection_string: str,
+    container_name: str,
+    blob_file_name: str,
+    **kwargs: Any,
+) -> dict[str, str]:
+    """Gets the metadata of a blob in Azure Blob Storage.
+
+    Args:
+        connection_string (str): The connection string for the Azure Storage account.
+        container_name (str): The name of the container.
+        blob_file_name (str): The name of the blob.
+
+    Raises:
+        BlobStorageError: An error occurred while getting the metadata from Azure Blob Storage.
+
+    Returns:
+        dict[str, str]: The metadata of the blob, empty when the blob does not exist.
+    """
+    try:
+        blob_service_client = get_blob_service_client(connection_string)
+        blob_client = blob_service_client.get_blob_client(
+            container=container_name, blob=blob_file_name
+        )
+        return dict(blob_client.get_blob_properties(**kwargs).metadata)
+    except ResourceNotFoundError:
+        return {}
+    except Exception as e:
+        raise BlobStorageError(e) from e
+
+
 def insert_table_storage_record(
     connection_string: str,
     table_name: str,
@@ -59,10 +280,65 @@ def insert_table_storage_record(
         TableStorageError: An error occurred while inserting the record into Azure Table Storage.
     """
     try:
-        table_service_client = TableServiceClient.from_connection_string(
-            conn_str=connection_string
-        )
+        table_service_client = get_table_service_client(connection_string)
         table_client = table_service_client.get_table_client(table_name=table_name)
         table_client.upsert_entity(entity=entity, mode=mode, **kwargs)
     except Exception as e:
         raise TableStorageError(e) from e
+
+
+def submit_table_storage_transaction(
+    connection_string: str,
+    table_name: str,
+    operations: list[tuple[Any, ...]],
+    **kwargs: Any,
+):
+    """Submits a batch of operations on a single partition as one transaction.
+
+    Args:
+        connection_string (str): The connection string for the Azure Storage account.
+        table_name (str): The name of the table.
+        operations (list[tuple]): The operations, for example ("upsert", entity, {"mode": mode}).
+
+    Raises:
+        TableStorageError: An error occurred while submitting the transaction to Azure Table Storage.
+    """
+    try:
+        table_service_client = get_table_service_client(connection_string)
+        table_client = table_service_client.get_table_client(table_name=table_name)
+        table_client.submit_transaction(operations=operations, **kwargs)
+    except Exception as e:
+        raise TableStorageError(e) from e
+
+
+def query_table_storage_records(
+    connection_string: str,
+    table_name: str,
+    query_filter: str,
+    select: Optional[list[str]] = None,
+    parameters: Optional[dict[str, Any]] = None,
+    **kwargs: Any,
+) -> Iterator[TableEntity]:
+    """Queries records from an Azure Table Storage table.
+
+    Args:
+        connection_string (str): The connection string for the Azure Storage account.
+        table_name (str): The name of the table.
+        query_filter (str): The filter to select the records.
+        select (list[str], optional): The properties to return. Defaults to None.
+        parameters (dict, optional): The parameters used in the filter. Defaults to None.
+
+    Raises:
+        TableStorageError: An error occurred while querying records from Azure Table Storage.
+
+    Yields:
+        TableEntity: The records that match the filter.
+    """
+    try:
+        table_service_client = get_table_service_client(connection_string)
+        table_client = table_service_client.get_table_client(table_name=table_name)
+        yield from table_client.query_entities(
+            query_filter=query_filter, select=select, parameters=parameters, **kwargs
+        )
+    except Exception as e:
+        raise TableStorageError(e) from e
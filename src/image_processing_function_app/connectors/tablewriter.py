@@ -0,0 +1,228 @@
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from threading import Condition, Thread
+from time import monotonic
+from typing import Optional
+
+from azure.data.tables import RequestTooLargeError, TableTransactionError, UpdateMode
+
+from image_processing_function_app.connectors.azurestorage import (
+    submit_table_storage_transaction,
+)
+from image_processing_function_app.exceptions import TableStorageError
+
+# Azure Table Storage allows at most 100 operations in a transaction.
+MAX_BATCH_SIZE_DEFAULT = 100
+MAX_DELAY_DEFAULT = 0.005
+# Requests give up waiting for a write well before the function timeout.
+WRITE_TIMEOUT_DEFAULT = 30.0
+
+
+class BatchedTableWriter:
+    """Writes entities from concurrent requests to table storage in
+    transactions.
+
+    Entities that share a partition key are coalesced by a background
+    thread into a single transaction, which is submitted when it is full
+    or when the oldest entity has waited max_delay seconds.
+    """
+
+    def __init__(
+        self,
+        connection_string: str,
+        table_name: str,
+        mode: UpdateMode = UpdateMode.MERGE,
+        max_batch_size: int = MAX_BATCH_SIZE_DEFAULT,
+        max_delay: float = MAX_DELAY_DEFAULT,
+    ):
+        """Initializes the BatchedTableWriter.
+
+        Args:
+            connection_string (str): The connection string.
+            table_name (str): The table name.
+            mode (UpdateMode, optional): The update mode. Defaults to UpdateMode.MERGE.
+            max_batch_size (int, optional): The maximum number of entities per transaction. Defaults to 100.
+            max_delay (float, optional): The maximum seconds an entity waits for a batch. Defaults to 0.005.
+        """
+        self.connection_string = connection_string
+        self.table_name = table_name
+        self.mode = mode
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._condition = Condition()
+        self._pending: dict[str, list[tuple[dict, Future]]] = {}
+        self._deadlines: dict[str, float] = {}
+        self._closed = False
+        self._thread: Optional[Thread] = None
+
+    def submit(self, entity: dict) -> Future:
+        """Queues an entity to be written.
+
+        Args:
+            entity (dict): The entity to write.
+
+        Raises:
+            TableStorageError: The writer is closed.
+
+        Returns:
+            Future: Resolves when the entity is committed to table storage.
+        """
+        future: Future = Future()
+        partition_key = str(entity["PartitionKey"])
+        with self._condition:
+            if self._closed:
+                raise TableStorageError("The table writer is closed.")
+            # Start the background thread, or restart it when it has died
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(
+                    target=self._run, name="BatchedTableWriter", daemon=True
+                )
+                self._thread.start()
+            if partition_key not in self._pending:
+                self._pending[partition_key] = []
+                self._deadlines[partition_key] = monotonic() + self.max_delay
+            self._pending[partition_key].append((entity, future))
+            self._condition.notify()
+        return future
+
+    def write(self, entity: dict, timeout: Optional[float] = None):
+        """Writes an entity and waits until it is committed to table storage.
+
+        Args:
+            entity (dict): The entity to write.
+            timeout (float, optional): The maximum seconds to wait. Defaults to None, which
+                waits until the entity is written.
+
+        Raises:
+            TableStorageError: An error occurred while writing the entity to table storage,
+                or the entity was not written within the timeout.
+        """
+        try:
+            self.submit(entity).result(timeout=timeout)
+        except TableStorageError:
+            raise
+        except FutureTimeoutError as e:
+            raise TableStorageError(
+                f"The entity was not written within {timeout} seconds."
+            ) from e
+        except Exception as e:
+            raise TableStorageError(e) from e
+
+    def close(self):
+        """Writes the pending entities and stops the background thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _run(self):
+        """Submits batches until the writer is closed."""
+        while True:
+            with self._condition:
+                while True:
+                    now = monotonic()
+                    ready = [
+                        partition_key
+                        for partition_key, items in self._pending.items()
+                        if self._closed
+                        or len(items) >= self.max_batch_size
+                        or self._deadlines[partition_key] <= now
+                    ]
+                    if ready or (self._closed and not self._pending):
+                        break
+                    timeout = (
+                        min(self._deadlines.values()) - now if self._deadlines else None
+                    )
+                    self._condition.wait(timeout)
+
+                if not ready:
+                    return
+                batches = []
+                for partition_key in ready:
+                    batches.append(self._pending.pop(partition_key))
+                    del self._deadlines[partition_key]
+
+            for batch in batches:
+                try:
+                    for chunk in self._chunks(batch):
+                        self._write_chunk(chunk)
+                except Exception as e:
+                    # Never leave a request waiting on an unresolved future
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(TableStorageError(e))
+
+    def _chunks(self, batch: list[tuple[dict, Future]]):
+        """Splits a batch into transactions with unique row keys."""
+        chunk: list[tuple[dict, Future]] = []
+        row_keys: set[str] = set()
+        for entity, future in batch:
+            row_key = str(entity["RowKey"])
+            if len(chunk) >= self.max_batch_size or row_key in row_keys:
+                yield chunk
+                chunk, row_keys = [], set()
+            chunk.append((entity, future))
+            row_keys.add(row_key)
+        if chunk:
+            yield chunk
+
+    def _write_chunk(self, chunk: list[tuple[dict, Future]]):
+        """Writes a chunk as one transaction.
+
+        When the transaction fails on one entity, that entity fails and
+        the other entities are submitted again as one transaction. Any
+        other error fails all entities of the chunk.
+        """
+        while chunk:
+            try:
+                submit_table_storage_transaction(
+                    connection_string=self.connection_string,
+                    table_name=self.table_name,
+                    operations=[
+                        ("upsert", entity, {"mode": self.mode}) for entity, _ in chunk
+                    ],
+                )
+            except TableStorageError as e:
+                cause = e.__cause__
+                # A transaction that is too large is not caused by one entity
+                if (
+                    not isinstance(cause, TableTransactionError)
+                    or isinstance(cause, RequestTooLargeError)
+                    or not 0 <= cause.index < len(chunk)
+                ):
+                    for _, future in chunk:
+                        future.set_exception(e)
+                    return
+                _, failed_future = chunk.pop(cause.index)
+                failed_future.set_exception(e)
+            else:
+                for _, future in chunk:
+                    future.set_result(None)
+                return
+
+
+@lru_cache(maxsize=None)
+def get_batched_table_writer(
+    connection_string: str,
+    table_name: str,
+    mode: UpdateMode = UpdateMode.MERGE,
+) -> BatchedTableWriter:
+    """Returns a BatchedTableWriter, which is shared by all requests of the
+    worker.
+
+    Args:
+        connection_string (str): The connection string.
+        table_name (str): The table name.
+        mode (UpdateMode, optional): The update mode. Defaults to UpdateMode.MERGE.
+
+    Returns:
+        BatchedTableWriter: The writer for the table.
+    """
+    return BatchedTableWriter(
+        connection_string=connection_string,
+        table_name=table_name,
+        mode=mode,
+    )
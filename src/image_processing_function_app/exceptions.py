@@ -20,3 +20,27 @@ class TableStorageError(Exception):
     """Exception raised for errors in the table storage."""
 
     pass
+
+
+class OptimizationError(Exception):
+    """Exception raised for errors in the image optimization."""
+
+    pass
+
+
+class SettingsError(Exception):
+    """Exception raised for errors in the settings."""
+
+    pass
+
+
+class PerceptualHashError(Exception):
+    """Exception raised for errors in the perceptual hash."""
+
+    pass
+
+
+class UploadError(Exception):
+    """Exception raised for invalid requests in a resumable upload."""
+
+    pass
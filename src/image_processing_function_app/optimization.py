@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, Optional
+
+from PIL import ExifTags
+from PIL import Image as PILImage
+from PIL import JpegImagePlugin
+
+from image_processing_function_app.exceptions import OptimizationError
+
+# EXIF tags that are kept when the image is optimized, other metadata except the ICC
+# profile is stripped.
+EXIF_TAGS_DEFAULT: tuple[int, ...] = (
+    ExifTags.Base.Make,
+    ExifTags.Base.Model,
+    ExifTags.Base.Orientation,
+    ExifTags.Base.DateTime,
+)
+
+FILE_EXTENSIONS = {
+    "JPEG": ".jpg",
+    "PNG": ".png",
+    "WEBP": ".webp",
+}
+
+
+@dataclass
+class OptimizationResult:
+    """Result of optimizing an image."""
+
+    data: bytes
+    image_format: str
+    original_size: int
+    stored_size: int
+
+    @property
+    def file_extension(self) -> str:
+        """Returns the file extension for the image format."""
+        return FILE_EXTENSIONS[self.image_format]
+
+
+def optimize_image(
+    binary_image: bytes,
+    image_format: Optional[str] = None,
+    quality: Optional[int] = None,
+    exif_tags: tuple[int, ...] = EXIF_TAGS_DEFAULT,
+) -> OptimizationResult:
+    """Optimizes an image to reduce the number of bytes stored.
+
+    Without a quality a JPEG is re-encoded with the quantization tables and subsampling of
+    the original and optimized Huffman tables. This is a lossy re-encode: the pixels are
+    decoded and compressed again, so the result is not bit-exact like jpegtran. With a
+    quality the image is transcoded with the given quality. The ICC profile is kept. The
+    original image is returned when optimizing does not make the image smaller.
+
+    Args:
+        binary_image (bytes): The binary image data.
+        image_format (str, optional): The target image format. Defaults to the format of the image.
+        quality (int, optional): The target quality (1-100). Defaults to None.
+        exif_tags (tuple[int, ...], optional): The EXIF tags to keep. Defaults to EXIF_TAGS_DEFAULT.
+
+    Raises:
+        OptimizationError: An error occurred while optimizing the image.
+
+    Returns:
+        OptimizationResult: The optimized image.
+    """
+    try:
+        image: PILImage.Image = PILImage.open(BytesIO(binary_image))
+        # Pillow opens JPEGs with multi-picture (MPO) data, as written by many phones,
+        # as MPO. The primary image is a regular JPEG, which is what is stored.
+        source_format = "JPEG" if image.format == "MPO" else str(image.format)
+        target_format = (image_format or source_format).upper()
+        if target_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported image format: {target_format}")
+
+        exif = PILImage.Exif()
+        for tag, value in image.getexif().items():
+            if tag in exif_tags:
+                exif[tag] = value
+
+        save_kwargs: dict[str, Any] = {
+            "format": target_format,
+            "optimize": True,
+            "exif": exif.tobytes(),
+            "icc_profile": image.info.get("icc_profile"),
+        }
+        if quality is not None:
+            save_kwargs["quality"] = quality
+        elif target_format == "JPEG" and source_format == "JPEG":
+            # Pillow only accepts "keep" for images it opened as JPEG, not as MPO
+            save_kwargs["qtables"] = image.quantization
+            save_kwargs["subsampling"] = JpegImagePlugin.get_sampling(image)
+
+        if target_format == "JPEG" and image.mode not in ("RGB", "L", "CMYK"):
+            image = image.convert("RGB")
+
+        output = BytesIO()
+        image.save(output, **save_kwargs)
+        data = output.getvalue()
+    except Exception as e:
+        raise OptimizationError(f"Failed to optimize image: {e}") from e
+
+    if len(data) >= len(binary_image) and target_format == source_format:
+        return OptimizationResult(
+            data=binary_image,
+            image_format=source_format,
+            original_size=len(binary_image),
+            stored_size=len(binary_image),
+        )
+
+    return OptimizationResult(
+        data=data,
+        image_format=target_format,
+        original_size=len(binary_image),
+        stored_size=len(data),
+    )
@@ -0,0 +1,272 @@
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+from logging import Logger, getLogger
+from typing import Optional
+
+import numpy as np
+from PIL import Image as PILImage
+
+from image_processing_function_app.connectors.azurestorage import (
+    query_table_storage_records,
+)
+from image_processing_function_app.exceptions import PerceptualHashError
+
+LOGGER = getLogger(__name__)
+
+HASH_SIZE_DEFAULT = 8
+
+# The NearDuplicateIndex splits a hash into SUBSTRINGS substrings of SUBSTRING_BITS bits
+HASH_BITS = 64
+SUBSTRINGS = 4
+SUBSTRING_BITS = HASH_BITS // SUBSTRINGS
+SUBSTRING_MASK = (1 << SUBSTRING_BITS) - 1
+# Larger substring distances look up too many substring values to beat a full scan
+MAX_SUBSTRING_DISTANCE = 2
+INITIAL_CAPACITY = 1024
+# Hashes added since the substring tables were updated are compared one by one, until
+# there are more than MAX_TAIL_SIZE of them
+MAX_TAIL_SIZE = 8192
+
+
+def dhash(binary_image: bytes, hash_size: int = HASH_SIZE_DEFAULT) -> int:
+    """Computes the difference hash (dHash) of an image.
+
+    The image is decoded at a reduced scale, converted to grayscale and resized to
+    (hash_size + 1) x hash_size pixels. Each bit of the hash is set when a pixel is
+    brighter than its right neighbour.
+
+    Args:
+        binary_image (bytes): The binary image data.
+        hash_size (int, optional): The number of bits per row of the hash. Defaults to 8.
+
+    Raises:
+        PerceptualHashError: An error occurred while computing the hash of the image.
+
+    Returns:
+        int: The hash with hash_size * hash_size bits.
+    """
+    try:
+        source = PILImage.open(BytesIO(binary_image))
+        # Let the JPEG decoder scale down by up to 8x, which avoids a full size decode
+        source.draft("L", (hash_size * 8, hash_size * 8))
+        image = source.convert("L").resize(
+            (hash_size + 1, hash_size), PILImage.Resampling.BILINEAR
+        )
+        pixels = np.asarray(image, dtype=np.int16)
+        bits = pixels[:, 1:] > pixels[:, :-1]
+        return int.from_bytes(np.packbits(bits).tobytes(), byteorder="big")
+    except Exception as e:
+        raise PerceptualHashError(f"Failed to compute perceptual hash: {e}") from e
+
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    """Returns the number of bits that differ between two hashes."""
+    return (hash_a ^ hash_b).bit_count()
+
+
+def _bit_counts(values: np.ndarray) -> np.ndarray:
+    """Returns the number of bits set in each value of a uint64 array."""
+    values = values - ((values >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    values = (values & np.uint64(0x3333333333333333)) + (
+        (values >> np.uint64(2)) & np.uint64(0x3333333333333333)
+    )
+    values = (values + (values >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (values * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+@lru_cache(maxsize=None)
+def _substring_masks(max_distance: int) -> np.ndarray:
+    """Returns the substring values with at most max_distance bits set."""
+    values = np.arange(1 << SUBSTRING_BITS, dtype=np.uint64)
+    return values[_bit_counts(values) <= max_distance].astype(np.uint16)
+
+
+class NearDuplicateIndex:
+    """In-memory multi-index hash table of 64-bit perceptual hashes.
+
+    Finds near-duplicate images within a Hamming distance. The hashes
+    are stored in a NumPy uint64 array and split into SUBSTRINGS
+    substrings of 16 bits. Each substring has a table of the substring
+    values with the positions of the hashes, sorted by value. By the
+    pigeonhole principle a hash within distance max_distance of a query
+    has a substring within max_distance // SUBSTRINGS of the query
+    substring, so only the hashes found by looking up these substring
+    values are compared. A search with a max_distance of
+    (MAX_SUBSTRING_DISTANCE + 1) * SUBSTRINGS or more compares all
+    hashes instead.
+
+    Added hashes are kept in an unsorted tail, which every search
+    compares. The tail is merged into the substring tables once it holds
+    more than MAX_TAIL_SIZE hashes, so adding and searching in turn does
+    not sort the tables on every search.
+    """
+
+    def __init__(self):
+        """Initializes an empty NearDuplicateIndex."""
+        self._hashes = np.zeros(INITIAL_CAPACITY, dtype=np.uint64)
+        self._keys: list[str] = []
+        self._key_set: set[str] = set()
+        # The sorted substring values and hash positions of each substring
+        self._tables: list[tuple[np.ndarray, np.ndarray]] = [
+            (np.zeros(0, dtype=np.uint16), np.zeros(0, dtype=np.uint32))
+            for _ in range(SUBSTRINGS)
+        ]
+        # The hashes from this position on are in the tail
+        self._tables_size = 0
+        self.last_timestamp: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        """Returns the number of keys in the index."""
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        """Returns whether the key is in the index."""
+        return key in self._key_set
+
+    def add(self, key: str, perceptual_hash: int) -> bool:
+        """Adds a hash to the index.
+
+        Args:
+            key (str): The key of the image, for example the blob name.
+            perceptual_hash (int): The 64-bit perceptual hash of the image.
+
+        Raises:
+            PerceptualHashError: The hash is not a 64-bit unsigned integer.
+
+        Returns:
+            bool: Whether the key was added, keys already in the index are skipped.
+        """
+        if not 0 <= perceptual_hash < 1 << HASH_BITS:
+            raise PerceptualHashError(
+                f"Perceptual hash must be a {HASH_BITS}-bit unsigned integer."
+            )
+        if key in self._key_set:
+            return False
+
+        size = len(self._keys)
+        if size == len(self._hashes):
+            self._hashes = np.concatenate([self._hashes, np.zeros_like(self._hashes)])
+        self._hashes[size] = perceptual_hash
+        self._keys.append(key)
+        self._key_set.add(key)
+        return True
+
+    def search(self, perceptual_hash: int, max_distance: int) -> list[tuple[str, int]]:
+        """Finds the near-duplicates of a hash.
+
+        Args:
+            perceptual_hash (int): The 64-bit perceptual hash of the image.
+            max_distance (int): The maximum Hamming distance of a near-duplicate.
+
+        Returns:
+            list[tuple[str, int]]: The keys and distances of the near-duplicates, closest first.
+        """
+        size = len(self._keys)
+        if size == 0 or max_distance < 0:
+            return []
+
+        query = np.uint64(perceptual_hash)
+        substring_distance = max_distance // SUBSTRINGS
+        if substring_distance > MAX_SUBSTRING_DISTANCE:
+            candidates = np.arange(size)
+        else:
+            if size - self._tables_size > MAX_TAIL_SIZE:
+                self._merge_tail()
+            masks = _substring_masks(substring_distance)
+            found: list[np.ndarray] = [np.arange(self._tables_size, size)]
+            for i, (values, positions) in enumerate(self._tables):
+                substring = (perceptual_hash >> (i * SUBSTRING_BITS)) & SUBSTRING_MASK
+                lookups = masks ^ np.uint16(substring)
+                starts = np.searchsorted(values, lookups, side="left")
+                ends = np.searchsorted(values, lookups, side="right")
+                found.extend(
+                    positions[start:end]
+                    for start, end in zip(starts, ends)
+                    if start < end
+                )
+            candidates = np.unique(np.concatenate(found))
+
+        distances = _bit_counts(self._hashes[candidates] ^ query)
+        matches = distances <= max_distance
+        results = [
+            (self._keys[position], int(distance))
+            for position, distance in zip(candidates[matches], distances[matches])
+        ]
+        return sorted(results, key=lambda result: (result[1], result[0]))
+
+    def _merge_tail(self):
+        """Merges the hashes in the tail into the substring tables."""
+        start, size = self._tables_size, len(self._keys)
+        tail = self._hashes[start:size]
+        tail_positions = np.arange(start, size, dtype=np.uint32)
+        for i, (values, positions) in enumerate(self._tables):
+            tail_values = (
+                (tail >> np.uint64(i * SUBSTRING_BITS)) & np.uint64(SUBSTRING_MASK)
+            ).astype(np.uint16)
+            # Only the tail is sorted, it is then inserted into the sorted table
+            order = np.argsort(tail_values, kind="stable")
+            insert_at = np.searchsorted(values, tail_values[order], side="right")
+            self._tables[i] = (
+                np.insert(values, insert_at, tail_values[order]),
+                np.insert(positions, insert_at, tail_positions[order]),
+            )
+        self._tables_size = size
+
+    def update_from_table(
+        self,
+        connection_string: str,
+        table_name: str,
+        logger: Logger = LOGGER,
+        **kwargs,
+    ) -> int:
+        """Adds the records that changed since the last update from table
+        storage.
+
+        Records with a malformed perceptual hash are skipped with a warning.
+
+        Args:
+            connection_string (str): The connection string.
+            table_name (str): The table name.
+            logger (Logger, optional): The logger. Defaults to LOGGER.
+
+        Raises:
+            TableStorageError: An error occurred while querying the records from table storage.
+
+        Returns:
+            int: The number of keys added to the index.
+        """
+        if self.last_timestamp is None:
+            query_filter = "PerceptualHash ne ''"
+            parameters = None
+        else:
+            query_filter = "PerceptualHash ne '' and Timestamp ge @last_timestamp"
+            parameters = {"last_timestamp": self.last_timestamp}
+
+        # The timestamp is only advanced once all records are added, so records are
+        # queried again after a failed update
+        added = 0
+        last_timestamp = self.last_timestamp
+        for entity in query_table_storage_records(
+            connection_string=connection_string,
+            table_name=table_name,
+            query_filter=query_filter,
+            select=["RowKey", "PerceptualHash", "Timestamp"],
+            parameters=parameters,
+            **kwargs,
+        ):
+            try:
+                if self.add(entity["RowKey"], int(entity["PerceptualHash"], 16)):
+                    added += 1
+            except (ValueError, PerceptualHashError) as e:
+                logger.warning(
+                    f"Skipping malformed perceptual hash of {entity['RowKey']}: {e}"
+                )
+            timestamp = entity.metadata.get("timestamp")
+            if timestamp is not None and (
+                last_timestamp is None or timestamp > last_timestamp
+            ):
+                last_timestamp = timestamp
+
+        self.last_timestamp = last_timestamp
+        return added
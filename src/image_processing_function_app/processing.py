@@ -1,28 +1,23 @@
 from logging import Logger, getLogger
+from typing import Optional
 
 import azure.functions as func
-from azure.data.tables import UpdateMode
 
-from image_processing_function_app.connectors.azurestorage import (
-    insert_table_storage_record,
-    upload_to_blob_storage,
-)
+from image_processing_function_app.connectors.azurestorage import upload_to_blob_storage
 from image_processing_function_app.exceptions import (
     BlobStorageError,
     ImageProcessingError,
-    MetadataError,
-    TableStorageError,
-)
-from image_processing_function_app.metadata import (
-    METADATA_DEFAULT,
-    Metadata,
-    get_metadata,
+    OptimizationError,
+    PerceptualHashError,
 )
+from image_processing_function_app.optimization import EXIF_TAGS_DEFAULT, optimize_image
+from image_processing_function_app.perceptual_hash import dhash
+from image_processing_function_app.records import ImageRecord
 
 LOGGER = getLogger(__name__)
 
 
-class ImageProcessingFunctionRequest:
+class ImageProcessingFunctionRequest(ImageRecord):
     """Represents a request to an image processing function."""
 
     def __init__(
@@ -36,14 +31,16 @@ class ImageProcessingFunctionRequest:
             req (func.HttpRequest): The HTTP request.
             logger (Logger): The logger.
         """
-        self.logger = logger
+        super().__init__(logger=logger)
         self.method = req.method
         self.url = req.url
         self.headers = req.headers
         self.params = req.params
         self.route_params = req.route_params
         self.body = req.get_body()
-        self.metadata: Metadata = self.__get_metadata()
+        self.original_size = len(self.body)
+        self.file_extension = ".jpg"
+        self.metadata = self._get_metadata(binary_image=self.body)
 
     @classmethod
     def from_http_request(
@@ -63,13 +60,52 @@ class ImageProcessingFunctionRequest:
         return cls(req=req, logger=logger)
 
     @property
-    def metadata_dict(self):
-        """Returns the metadata as a dictionary."""
-        return {
-            "make": self.metadata.make,
-            "exif_ifd_pointer": self.metadata.exif_ifd_pointer,
-            "gps_ifd_pointer": self.metadata.gps_ifd_pointer,
-        }
+    def stored_size(self) -> int:
+        """Returns the size of the image that is stored."""
+        return len(self.body)
+
+    def compute_perceptual_hash(self):
+        """Computes the perceptual hash of the image for the table record.
+
+        Call it before optimize_image, so the hash is computed from the
+        original image. When the hash can not be computed the table
+        record has no perceptual hash.
+        """
+        try:
+            self.perceptual_hash = dhash(binary_image=self.body)
+        except PerceptualHashError as e:
+            self.logger.warning(e)
+            self.perceptual_hash = None
+
+    def optimize_image(
+        self,
+        image_format: Optional[str] = None,
+        quality: Optional[int] = None,
+        exif_tags: tuple[int, ...] = EXIF_TAGS_DEFAULT,
+    ):
+        """Optimizes the image before it is stored.
+
+        The metadata is extracted from the original image and is kept. When the image
+        can not be optimized the original image is stored.
+
+        Args:
+            image_format (str, optional): The target image format. Defaults to the format of the image.
+            quality (int, optional): The target quality (1-100). Defaults to None.
+            exif_tags (tuple[int, ...], optional): The EXIF tags to keep. Defaults to EXIF_TAGS_DEFAULT.
+        """
+        try:
+            result = optimize_image(
+                binary_image=self.body,
+                image_format=image_format,
+                quality=quality,
+                exif_tags=exif_tags,
+            )
+        except OptimizationError as e:
+            self.logger.warning(e)
+            return
+
+        self.body = result.data
+        self.file_extension = result.file_extension
 
     def upload_to_blob_storage(
         self,
@@ -100,57 +136,3 @@ class ImageProcessingFunctionRequest:
         except BlobStorageError as e:
             self.logger.error(f"Failed to upload image to blob storage: {e}")
             raise ImageProcessingError("Failed to upload image to blob storage.") from e
-
-    def insert_table_storage_record(
-        self,
-        connection_string: str,
-        table_name: str,
-        blob_file_name: str,
-        partition_key: str,
-        row_key: str,
-        mode: UpdateMode = UpdateMode.MERGE,
-        **kwargs,
-    ):
-        """Inserts a record to table storage.
-
-        Args:
-            connection_string (str): The connection string.
-            table_name (str): The table name.
-            blob_file_name (str): The blob file name.
-            partition_key (str): The partition key.
-            row_key (str): The row key.
-            mode (UpdateMode, optional): The update mode. Defaults to UpdateMode.MERGE.
-
-        Raises:
-            ImageProcessingError: An error occurred while inserting the record to table storage.
-        """
-        try:
-            insert_table_storage_record(
-                connection_string=connection_string,
-                table_name=table_name,
-                entity={
-                    "PartitionKey": str(partition_key),
-                    "RowKey": str(row_key),
-                    "BlobName": str(blob_file_name),
-                    **self.metadata_dict,
-                },
-                mode=mode,
-                **kwargs,
-            )
-        except TableStorageError as e:
-            self.logger.error(f"Failed to insert record to table storage: {e}")
-            raise ImageProcessingError(
-                "Failed to insert record to table storage."
-            ) from e
-
-    def __get_metadata(self) -> Metadata:
-        """Extracts metadata from the image.
-
-        Returns:
-            Metadata: The metadata extracted from the image.
-        """
-        try:
-            return get_metadata(binary_image=self.body)
-        except MetadataError as e:
-            self.logger.warning(e)
-            return METADATA_DEFAULT
@@ -0,0 +1,277 @@
+import cProfile
+import pstats
+import random
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from io import StringIO
+from logging import Logger, getLogger
+from threading import Lock
+from time import perf_counter, thread_time
+from typing import Callable, Iterator, Mapping, Optional
+
+from image_processing_function_app.connectors.azurestorage import upload_to_blob_storage
+from image_processing_function_app.exceptions import BlobStorageError
+from image_processing_function_app.settings import Settings
+
+LOGGER = getLogger(__name__)
+
+PROFILING_HEADER = "X-Profile"
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 10
+
+# tracemalloc traces the whole process, so it is started by the first and stopped by
+# the last of the concurrent sampled invocations
+_tracing_lock = Lock()
+_tracing_count = 0
+_tracing_started = False
+
+
+def _start_tracing():
+    """Starts tracemalloc unless it is already traced by another invocation."""
+    global _tracing_count, _tracing_started
+    with _tracing_lock:
+        if _tracing_count == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_count += 1
+
+
+def _stop_tracing() -> Optional[tracemalloc.Snapshot]:
+    """Stops tracemalloc when it is no longer traced by another invocation.
+
+    Returns:
+        tracemalloc.Snapshot: The traced memory blocks, or None when tracemalloc is not tracing.
+    """
+    global _tracing_count, _tracing_started
+    with _tracing_lock:
+        try:
+            return tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        finally:
+            _tracing_count -= 1
+            if _tracing_count == 0 and _tracing_started:
+                tracemalloc.stop()
+                _tracing_started = False
+
+
+@dataclass
+class StageProfile:
+    """Time and memory used by a stage of an invocation."""
+
+    name: str
+    wall_time: float
+    cpu_time: float
+    allocated: int
+    peak: int
+
+
+class Profiler:
+    """Profiler that does nothing, used when an invocation is not sampled."""
+
+    sampled = False
+
+    def __enter__(self) -> "Profiler":
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+    def stage(self, name: str):
+        """Returns a context manager that profiles a stage of the invocation.
+
+        Args:
+            name (str): The name of the stage.
+        """
+        return nullcontext()
+
+
+NULL_PROFILER = Profiler()
+
+
+class InvocationProfiler(Profiler):
+    """Profiles the CPU time and memory allocations of a single invocation.
+
+    Memory is traced with tracemalloc, which traces the whole process.
+    Allocations of concurrent invocations on the same worker are
+    therefore included as well. A failure of the profiler or the sink is
+    logged and does not fail the invocation.
+    """
+
+    sampled = True
+
+    def __init__(
+        self,
+        name: str,
+        sink: Callable[[str, str], None],
+        logger: Logger = LOGGER,
+    ):
+        """Initializes the InvocationProfiler.
+
+        Args:
+            name (str): The name of the invocation.
+            sink (Callable[[str, str], None]): Writes the report, called with the name and the report.
+            logger (Logger, optional): The logger. Defaults to LOGGER.
+        """
+        self.name = name
+        self.sink = sink
+        self.logger = logger
+        self.stages: list[StageProfile] = []
+        self.wall_time = 0.0
+        self._profile = cProfile.Profile()
+        self._profiling = False
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def __enter__(self) -> "InvocationProfiler":
+        _start_tracing()
+        self._start = perf_counter()
+        try:
+            self._profile.enable()
+            self._profiling = True
+        except Exception as e:
+            self.logger.warning(f"Failed to start profiler: {e}")
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._profiling:
+            self._profile.disable()
+        self.wall_time = perf_counter() - self._start
+        try:
+            self._snapshot = _stop_tracing()
+            self.sink(self.name, self.report())
+        except Exception as e:
+            self.logger.warning(f"Failed to write profiling report: {e}")
+        return None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Profiles a stage of the invocation.
+
+        Args:
+            name (str): The name of the stage.
+        """
+        tracemalloc.reset_peak()
+        memory_start, _ = tracemalloc.get_traced_memory()
+        wall_start = perf_counter()
+        cpu_start = thread_time()
+        try:
+            yield
+        finally:
+            cpu_time = thread_time() - cpu_start
+            wall_time = perf_counter() - wall_start
+            memory_end, memory_peak = tracemalloc.get_traced_memory()
+            self.stages.append(
+                StageProfile(
+                    name=name,
+                    wall_time=wall_time,
+                    cpu_time=cpu_time,
+                    allocated=memory_end - memory_start,
+                    peak=memory_peak - memory_start,
+                )
+            )
+
+    def report(self) -> str:
+        """Returns the profiling report of the invocation."""
+        output = StringIO()
+        output.write(f"Profile of invocation {self.name}\n")
+        output.write(f"Total wall time: {self.wall_time * 1000:.1f} ms\n\n")
+
+        output.write(
+            f"{'stage':<16}{'wall ms':>10}{'cpu ms':>10}{'alloc KiB':>12}{'peak KiB':>12}\n"
+        )
+        for stage in self.stages:
+            output.write(
+                f"{stage.name:<16}{stage.wall_time * 1000:>10.1f}{stage.cpu_time * 1000:>10.1f}"
+                f"{stage.allocated / 1024:>12.1f}{stage.peak / 1024:>12.1f}\n"
+            )
+
+        if self._snapshot is not None:
+            output.write("\nTop allocations:\n")
+            for statistic in self._snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+                output.write(f"{statistic}\n")
+
+        if self._profiling:
+            output.write("\n")
+            pstats.Stats(self._profile, stream=output).sort_stats(
+                pstats.SortKey.CUMULATIVE
+            ).print_stats(TOP_FUNCTIONS)
+        return output.getvalue()
+
+
+def is_sampled(headers: Mapping[str, str], settings: Settings) -> bool:
+    """Returns whether an invocation is profiled.
+
+    Args:
+        headers (Mapping[str, str]): The headers of the HTTP request.
+        settings (Settings): The settings.
+
+    Returns:
+        bool: Whether the invocation is profiled.
+    """
+    if (
+        settings.profiling_header_enabled
+        and headers.get(PROFILING_HEADER, "").lower() == "true"
+    ):
+        return True
+    return (
+        settings.profiling_sample_rate > 0
+        and random.random() * 100 < settings.profiling_sample_rate
+    )
+
+
+def write_profile_report(
+    name: str,
+    report: str,
+    settings: Settings,
+    logger: Logger = LOGGER,
+):
+    """Writes a profiling report to blob storage, or to the log when no
+    container is set.
+
+    Args:
+        name (str): The name of the invocation.
+        report (str): The profiling report.
+        settings (Settings): The settings.
+        logger (Logger, optional): The logger. Defaults to LOGGER.
+    """
+    if settings.profiling_container_name is None:
+        logger.info(report)
+        return
+
+    try:
+        upload_to_blob_storage(
+            connection_string=settings.azure_storage_connection_string,
+            container_name=settings.profiling_container_name,
+            blob_file_name=f"{name}.profile.txt",
+            data=report.encode(),
+        )
+    except BlobStorageError as e:
+        logger.warning(f"Failed to write profiling report: {e}")
+
+
+def get_profiler(
+    headers: Mapping[str, str],
+    settings: Settings,
+    name: str,
+    logger: Logger = LOGGER,
+) -> Profiler:
+    """Returns the profiler of an invocation.
+
+    Args:
+        headers (Mapping[str, str]): The headers of the HTTP request.
+        settings (Settings): The settings.
+        name (str): The name of the invocation.
+        logger (Logger, optional): The logger. Defaults to LOGGER.
+
+    Returns:
+        Profiler: An InvocationProfiler when the invocation is sampled, otherwise NULL_PROFILER.
+    """
+    if not is_sampled(headers=headers, settings=settings):
+        return NULL_PROFILER
+
+    return InvocationProfiler(
+        name=name,
+        sink=lambda name, report: write_profile_report(
+            name=name, report=report, settings=settings, logger=logger
+        ),
+        logger=logger,
+    )
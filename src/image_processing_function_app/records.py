@@ -0,0 +1,138 @@
+from logging import Logger, getLogger
+from typing import Optional
+
+from azure.data.tables import UpdateMode
+
+from image_processing_function_app.connectors.azurestorage import (
+    insert_table_storage_record,
+)
+from image_processing_function_app.connectors.tablewriter import (
+    WRITE_TIMEOUT_DEFAULT,
+    get_batched_table_writer,
+)
+from image_processing_function_app.exceptions import (
+    ImageProcessingError,
+    MetadataError,
+    TableStorageError,
+)
+from image_processing_function_app.metadata import (
+    METADATA_DEFAULT,
+    Metadata,
+    get_metadata,
+)
+
+LOGGER = getLogger(__name__)
+
+
+class ImageRecord:
+    """Represents a stored image with a record in table storage."""
+
+    def __init__(self, logger: Logger = LOGGER):
+        """Initializes the ImageRecord.
+
+        Args:
+            logger (Logger, optional): The logger. Defaults to LOGGER.
+        """
+        self.logger = logger
+        self.original_size = 0
+        self.metadata: Metadata = METADATA_DEFAULT
+        self.perceptual_hash: Optional[int] = None
+
+    @property
+    def metadata_dict(self):
+        """Returns the metadata as a dictionary."""
+        return {
+            "make": self.metadata.make,
+            "exif_ifd_pointer": self.metadata.exif_ifd_pointer,
+            "gps_ifd_pointer": self.metadata.gps_ifd_pointer,
+        }
+
+    @property
+    def perceptual_hash_dict(self):
+        """Returns the perceptual hash as a dictionary."""
+        if self.perceptual_hash is None:
+            return {}
+        return {"PerceptualHash": f"{self.perceptual_hash:016x}"}
+
+    @property
+    def stored_size(self) -> int:
+        """Returns the size of the image that is stored."""
+        return self.original_size
+
+    def insert_table_storage_record(
+        self,
+        connection_string: str,
+        table_name: str,
+        blob_file_name: str,
+        partition_key: str,
+        row_key: str,
+        mode: UpdateMode = UpdateMode.MERGE,
+        batched: bool = False,
+        write_timeout: float = WRITE_TIMEOUT_DEFAULT,
+        **kwargs,
+    ):
+        """Inserts a record to table storage.
+
+        Args:
+            connection_string (str): The connection string.
+            table_name (str): The table name.
+            blob_file_name (str): The blob file name.
+            partition_key (str): The partition key.
+            row_key (str): The row key.
+            mode (UpdateMode, optional): The update mode. Defaults to UpdateMode.MERGE.
+            batched (bool, optional): Whether to write the record in a transaction shared
+                with concurrent requests. Returns once the record is committed, or raises when
+                it is not committed within write_timeout seconds. Defaults to False.
+            write_timeout (float, optional): The maximum seconds to wait for a batched write.
+                Defaults to WRITE_TIMEOUT_DEFAULT.
+
+        Raises:
+            ImageProcessingError: An error occurred while inserting the record to table storage.
+        """
+        entity = {
+            "PartitionKey": str(partition_key),
+            "RowKey": str(row_key),
+            "BlobName": str(blob_file_name),
+            "OriginalSize": self.original_size,
+            "StoredSize": self.stored_size,
+            **self.perceptual_hash_dict,
+            **self.metadata_dict,
+        }
+        try:
+            if batched:
+                get_batched_table_writer(
+                    connection_string=connection_string,
+                    table_name=table_name,
+                    mode=mode,
+                ).write(
+                    entity=entity,
+                    timeout=write_timeout,
+                )
+            else:
+                insert_table_storage_record(
+                    connection_string=connection_string,
+                    table_name=table_name,
+                    entity=entity,
+                    mode=mode,
+                    **kwargs,
+                )
+        except TableStorageError as e:
+            self.logger.error(f"Failed to insert record to table storage: {e}")
+            raise ImageProcessingError(
+                "Failed to insert record to table storage."
+            ) from e
+
+    def _get_metadata(self, binary_image: bytes) -> Metadata:
+        """Extracts metadata from the image.
+
+        Args:
+            binary_image (bytes): The binary image data, or its header.
+
+        Returns:
+            Metadata: The metadata extracted from the image.
+        """
+        try:
+            return get_metadata(binary_image=binary_image)
+        except MetadataError as e:
+            self.logger.warning(e)
+            return METADATA_DEFAULT
@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from os import environ as os_environ
+from typing import Mapping, Optional
+
+from image_processing_function_app.exceptions import SettingsError
+from image_processing_function_app.optimization import FILE_EXTENSIONS
+
+REQUIRED_ENV_VARS = (
+    "AZURE_STORAGE_CONNECTION_STRING",
+    "AZURE_STORAGE_CONTAINER_NAME",
+    "AZURE_TABLE_CONNECTION_STRING",
+    "AZURE_TABLE_NAME",
+    "AZURE_TABLE_PARTITION_KEY",
+)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Settings of the image processing function app."""
+
+    azure_storage_connection_string: str
+    azure_storage_container_name: str
+    azure_table_connection_string: str
+    azure_table_name: str
+    azure_table_partition_key: str
+    azure_table_batch_writes: bool = False
+    image_optimization_enabled: bool = False
+    image_optimization_format: Optional[str] = None
+    image_optimization_quality: Optional[int] = None
+    profiling_header_enabled: bool = False
+    profiling_sample_rate: float = 0.0
+    profiling_container_name: Optional[str] = None
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str] = os_environ) -> "Settings":
+        """Creates the settings from environment variables.
+
+        Args:
+            env (Mapping[str, str], optional): The environment variables. Defaults to os.environ.
+
+        Raises:
+            SettingsError: A required environment variable is missing or a value is invalid.
+
+        Returns:
+            Settings: The settings.
+        """
+        missing = [name for name in REQUIRED_ENV_VARS if not env.get(name)]
+        if missing:
+            raise SettingsError(
+                f"Missing required environment variables: {', '.join(missing)}"
+            )
+
+        image_optimization_format = env.get("IMAGE_OPTIMIZATION_FORMAT") or None
+        if image_optimization_format is not None:
+            image_optimization_format = image_optimization_format.upper()
+            if image_optimization_format not in FILE_EXTENSIONS:
+                raise SettingsError(
+                    f"Invalid IMAGE_OPTIMIZATION_FORMAT: {image_optimization_format}"
+                )
+
+        image_optimization_quality = env.get("IMAGE_OPTIMIZATION_QUALITY") or None
+        quality = None
+        if image_optimization_quality is not None:
+            if not image_optimization_quality.isdecimal() or not (
+                1 <= int(image_optimization_quality) <= 100
+            ):
+                raise SettingsError(
+                    f"Invalid IMAGE_OPTIMIZATION_QUALITY: {image_optimization_quality}"
+                )
+            quality = int(image_optimization_quality)
+
+        profiling_sample_rate = env.get("PROFILING_SAMPLE_RATE") or "0"
+        try:
+            sample_rate = float(profiling_sample_rate)
+        except ValueError:
+            sample_rate = -1.0
+        if not 0 <= sample_rate <= 100:
+            raise SettingsError(
+                f"Invalid PROFILING_SAMPLE_RATE: {profiling_sample_rate}"
+            )
+
+        return cls(
+            azure_storage_connection_string=env["AZURE_STORAGE_CONNECTION_STRING"],
+            azure_storage_container_name=env["AZURE_STORAGE_CONTAINER_NAME"],
+            azure_table_connection_string=env["AZURE_TABLE_CONNECTION_STRING"],
+            azure_table_name=env["AZURE_TABLE_NAME"],
+            azure_table_partition_key=env["AZURE_TABLE_PARTITION_KEY"],
+            azure_table_batch_writes=env.get(
+                "AZURE_TABLE_BATCH_WRITES", "false"
+            ).lower()
+            == "true",
+            image_optimization_enabled=env.get(
+                "IMAGE_OPTIMIZATION_ENABLED", "false"
+            ).lower()
+            == "true",
+            image_optimization_format=image_optimization_format,
+            image_optimization_quality=quality,
+            profiling_header_enabled=env.get(
+                "PROFILING_HEADER_ENABLED", "false"
+            ).lower()
+            == "true",
+            profiling_sample_rate=sample_rate,
+            profiling_container_name=env.get("PROFILING_CONTAINER_NAME") or None,
+        )
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Returns the settings, which are loaded from the environment once per
+    worker.
+
+    Raises:
+        SettingsError: A required environment variable is missing or a value is invalid.
+
+    Returns:
+        Settings: The settings.
+    """
+    return Settings.from_env()
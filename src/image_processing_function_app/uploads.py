@@ -0,0 +1,269 @@
+import uuid
+from logging import Logger, getLogger
+
+from image_processing_function_app.connectors.azurestorage import (
+    commit_blob_block_list,
+    download_blob_range,
+    get_blob_block_list,
+    get_blob_metadata,
+    set_blob_metadata,
+    stage_blob_block,
+    upload_to_blob_storage,
+)
+from image_processing_function_app.exceptions import (
+    BlobStorageError,
+    ImageProcessingError,
+    UploadError,
+)
+from image_processing_function_app.records import ImageRecord
+
+LOGGER = getLogger(__name__)
+
+# Azure Blob Storage allows at most 50,000 blocks in a blob.
+MAX_CHUNKS = 50000
+# The EXIF metadata of a JPEG image is stored in an APP1 segment of at most 64 KiB.
+HEADER_SIZE = 64 * 1024
+# Uploads are stored apart from the images of other requests, which are not replaced
+BLOB_PREFIX = "uploads/"
+# Table storage row keys cannot contain a "/"
+ROW_KEY_PREFIX = "uploads-"
+# The blob metadata that marks a blob as the blob of an upload
+UPLOAD_ID_METADATA = "upload_id"
+
+
+def block_id(index: int) -> str:
+    """Returns the block id of a chunk, all block ids of a blob have the same
+    length."""
+    return f"{index:05d}"
+
+
+class ResumableUpload(ImageRecord):
+    """Represents an image that is uploaded in chunks, which are staged blocks
+    of a blob.
+
+    Chunks that were staged before a dropped connection are kept, so the
+    client only resends the missing chunks. Finalizing commits the
+    chunks in order and extracts the metadata from the header of the
+    image only.
+
+    Initiating an upload creates an empty blob with the upload id in its
+    metadata. Chunks are only accepted for a blob with this marker, so
+    an upload cannot replace a blob that was not initiated as an upload.
+    """
+
+    def __init__(
+        self,
+        upload_id: str,
+        connection_string: str,
+        container_name: str,
+        logger: Logger = LOGGER,
+    ):
+        """Initializes the ResumableUpload.
+
+        Args:
+            upload_id (str): The upload id.
+            connection_string (str): The connection string.
+            container_name (str): The container name.
+            logger (Logger, optional): The logger. Defaults to LOGGER.
+
+        Raises:
+            UploadError: The upload id is not valid.
+        """
+        super().__init__(logger=logger)
+        try:
+            self.upload_id = str(uuid.UUID(upload_id))
+        except (TypeError, ValueError) as e:
+            raise UploadError(f"Invalid upload id: {upload_id}") from e
+        self.connection_string = connection_string
+        self.container_name = container_name
+        self.blob_file_name = BLOB_PREFIX + self.upload_id + ".jpg"
+        self.row_key = ROW_KEY_PREFIX + self.upload_id + ".jpg"
+
+    @classmethod
+    def initiate(
+        cls,
+        connection_string: str,
+        container_name: str,
+        logger: Logger = LOGGER,
+    ) -> "ResumableUpload":
+        """Starts a new upload with a unique upload id.
+
+        Args:
+            connection_string (str): The connection string.
+            container_name (str): The container name.
+            logger (Logger, optional): The logger. Defaults to LOGGER.
+
+        Raises:
+            ImageProcessingError: An error occurred while creating the blob in blob storage.
+
+        Returns:
+            ResumableUpload: The ResumableUpload.
+        """
+        upload = cls(
+            upload_id=str(uuid.uuid4()),
+            connection_string=connection_string,
+            container_name=container_name,
+            logger=logger,
+        )
+        try:
+            upload_to_blob_storage(
+                connection_string=connection_string,
+                container_name=container_name,
+                blob_file_name=upload.blob_file_name,
+                data=b"",
+                metadata=upload.__marker,
+                overwrite=False,
+            )
+        except BlobStorageError as e:
+            upload.logger.error(f"Failed to create upload in blob storage: {e}")
+            raise ImageProcessingError(
+                "Failed to create upload in blob storage."
+            ) from e
+        return upload
+
+    def append_chunk(self, index: int, data: bytes):
+        """Stages a chunk of the image, a chunk that is sent again replaces the
+        previous one.
+
+        Args:
+            index (int): The index of the chunk, starting at 0.
+            data (bytes): The data of the chunk.
+
+        Raises:
+            UploadError: The index is out of range, the chunk is empty or the upload
+                was not initiated.
+            ImageProcessingError: An error occurred while staging the chunk in blob storage.
+        """
+        if not 0 <= index < MAX_CHUNKS:
+            raise UploadError(f"Chunk index must be between 0 and {MAX_CHUNKS - 1}.")
+        if not data:
+            raise UploadError("Chunk is empty.")
+        self.__check_initiated()
+
+        try:
+            stage_blob_block(
+                connection_string=self.connection_string,
+                container_name=self.container_name,
+                blob_file_name=self.blob_file_name,
+                block_id=block_id(index),
+                data=data,
+            )
+        except BlobStorageError as e:
+            self.logger.error(f"Failed to stage chunk in blob storage: {e}")
+            raise ImageProcessingError("Failed to stage chunk in blob storage.") from e
+
+    def staged_chunks(self) -> list[int]:
+        """Returns the indexes of the chunks that are staged.
+
+        Raises:
+            UploadError: The upload was not initiated.
+            ImageProcessingError: An error occurred while getting the chunks from blob storage.
+
+        Returns:
+            list[int]: The sorted indexes of the staged chunks.
+        """
+        self.__check_initiated()
+        return sorted(self.__get_chunk_sizes())
+
+    def finalize(self, chunk_count: int):
+        """Commits the chunks as the image and extracts the metadata from its
+        header.
+
+        Finalizing an upload again is allowed, for example when the response was lost.
+
+        Args:
+            chunk_count (int): The number of chunks of the image.
+
+        Raises:
+            UploadError: The chunk count is out of range, chunks are missing or the
+                upload was not initiated.
+            ImageProcessingError: An error occurred while committing the image in blob storage.
+        """
+        if not 0 < chunk_count <= MAX_CHUNKS:
+            raise UploadError(f"Chunk count must be between 1 and {MAX_CHUNKS}.")
+        self.__check_initiated()
+
+        chunk_sizes = self.__get_chunk_sizes()
+        missing = [index for index in range(chunk_count) if index not in chunk_sizes]
+        if missing:
+            raise UploadError(
+                f"Missing chunks: {', '.join(str(index) for index in missing)}"
+            )
+
+        try:
+            # The marker is committed with the blocks, so the upload can be finalized
+            # again when setting the metadata fails
+            commit_blob_block_list(
+                connection_string=self.connection_string,
+                container_name=self.container_name,
+                blob_file_name=self.blob_file_name,
+                block_ids=[block_id(index) for index in range(chunk_count)],
+                metadata=self.__marker,
+            )
+            self.original_size = sum(chunk_sizes[index] for index in range(chunk_count))
+            header = download_blob_range(
+                connection_string=self.connection_string,
+                container_name=self.container_name,
+                blob_file_name=self.blob_file_name,
+                offset=0,
+                length=min(self.original_size, HEADER_SIZE),
+            )
+            self.metadata = self._get_metadata(binary_image=header)
+            set_blob_metadata(
+                connection_string=self.connection_string,
+                container_name=self.container_name,
+                blob_file_name=self.blob_file_name,
+                metadata={**self.metadata_dict, **self.__marker},
+            )
+        except BlobStorageError as e:
+            self.logger.error(f"Failed to commit image in blob storage: {e}")
+            raise ImageProcessingError("Failed to commit image in blob storage.") from e
+
+    @property
+    def __marker(self) -> dict[str, str]:
+        """Returns the blob metadata that marks the blob of this upload."""
+        return {UPLOAD_ID_METADATA: self.upload_id}
+
+    def __check_initiated(self):
+        """Checks the blob was created by initiating this upload.
+
+        Raises:
+            UploadError: The upload was not initiated.
+            ImageProcessingError: An error occurred while getting the blob from blob storage.
+        """
+        try:
+            metadata = get_blob_metadata(
+                connection_string=self.connection_string,
+                container_name=self.container_name,
+                blob_file_name=self.blob_file_name,
+            )
+        except BlobStorageError as e:
+            self.logger.error(f"Failed to get upload from blob storage: {e}")
+            raise ImageProcessingError("Failed to get upload from blob storage.") from e
+
+        if metadata.get(UPLOAD_ID_METADATA) != self.upload_id:
+            raise UploadError(f"Unknown upload id: {self.upload_id}")
+
+    def __get_chunk_sizes(self) -> dict[int, int]:
+        """Returns the size of the latest version of each chunk by index.
+
+        Raises:
+            ImageProcessingError: An error occurred while getting the chunks from blob storage.
+        """
+        try:
+            committed, uncommitted = get_blob_block_list(
+                connection_string=self.connection_string,
+                container_name=self.container_name,
+                blob_file_name=self.blob_file_name,
+            )
+        except BlobStorageError as e:
+            self.logger.error(f"Failed to get chunks from blob storage: {e}")
+            raise ImageProcessingError("Failed to get chunks from blob storage.") from e
+
+        # An uncommitted block replaces a committed block with the same id, block ids
+        # that are not chunk indexes are ignored
+        return {
+            int(block.id): block.size
+            for block in [*committed, *uncommitted]
+            if block.id.isdecimal()
+        }
@@ -1,7 +1,19 @@
 from os import environ as os_environ
+from unittest.mock import MagicMock, patch
 
 import azure.functions as func
 import pytest
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.storage.blob import BlobBlock, BlobServiceClient
+
+from image_processing_function_app.connectors.azurestorage import (
+    get_blob_service_client,
+    get_table_service_client,
+)
+from image_processing_function_app.connectors.tablewriter import (
+    get_batched_table_writer,
+)
+from image_processing_function_app.settings import get_settings
 
 # The test image is a JPEG image with EXIF metadata, stored as a byte array.
 with open("tests/resources/car.jpg", "rb") as f:
@@ -48,11 +60,97 @@ def set_env_vars():
     os_environ["AZURE_TABLE_CONNECTION_STRING"] = "table_connection_string"
     os_environ["AZURE_TABLE_NAME"] = "table_name"
     os_environ["AZURE_TABLE_PARTITION_KEY"] = "PK"
+    get_settings.cache_clear()
 
     yield
 
+    get_settings.cache_clear()
     os_environ.pop("AZURE_STORAGE_CONNECTION_STRING", None)
     os_environ.pop("AZURE_STORAGE_CONTAINER_NAME", None)
     os_environ.pop("AZURE_TABLE_CONNECTION_STRING", None)
     os_environ.pop("AZURE_TABLE_NAME", None)
     os_environ.pop("AZURE_TABLE_PARTITION_KEY", None)
+    os_environ.pop("AZURE_TABLE_BATCH_WRITES", None)
+    os_environ.pop("IMAGE_OPTIMIZATION_ENABLED", None)
+    os_environ.pop("IMAGE_OPTIMIZATION_FORMAT", None)
+    os_environ.pop("IMAGE_OPTIMIZATION_QUALITY", None)
+    os_environ.pop("PROFILING_HEADER_ENABLED", None)
+    os_environ.pop("PROFILING_SAMPLE_RATE", None)
+    os_environ.pop("PROFILING_CONTAINER_NAME", None)
+
+
+@pytest.fixture(autouse=True)
+def clear_service_clients():
+    """Clear cached service clients."""
+    get_blob_service_client.cache_clear()
+    get_table_service_client.cache_clear()
+    get_batched_table_writer.cache_clear()
+
+    yield
+
+    get_blob_service_client.cache_clear()
+    get_table_service_client.cache_clear()
+    get_batched_table_writer.cache_clear()
+
+
+class FakeBlobClient:
+    """Blob client that keeps staged and committed blocks in memory."""
+
+    def __init__(self):
+        self.staged: dict[str, bytes] = {}
+        self.committed: dict[str, bytes] = {}
+        self.data = b""
+        self.metadata: dict = {}
+        self.exists = False
+
+    def upload_blob(self, data: bytes, blob_type: str, metadata=None, overwrite=False):
+        if self.exists and not overwrite:
+            raise ResourceExistsError("BlobAlreadyExists")
+        self.committed = {}
+        self.data = data
+        self.metadata = metadata or {}
+        self.exists = True
+
+    def get_blob_properties(self):
+        if not self.exists:
+            raise ResourceNotFoundError("BlobNotFound")
+        return MagicMock(metadata=self.metadata)
+
+    def stage_block(self, block_id: str, data: bytes):
+        self.staged[block_id] = data
+
+    def get_block_list(self, block_list_type: str):
+        def blocks(blocks_by_id: dict[str, bytes]) -> list[BlobBlock]:
+            block_list = []
+            for block_id, data in blocks_by_id.items():
+                block = BlobBlock(block_id=block_id)
+                block.size = len(data)
+                block_list.append(block)
+            return block_list
+
+        return blocks(self.committed), blocks(self.staged)
+
+    def commit_block_list(self, block_list: list[BlobBlock], metadata=None):
+        latest = {**self.committed, **self.staged}
+        self.committed = {block.id: latest[block.id] for block in block_list}
+        self.staged = {}
+        self.data = b"".join(self.committed.values())
+        self.metadata = metadata or {}
+        self.exists = True
+
+    def download_blob(self, offset: int, length: int):
+        return MagicMock(readall=MagicMock(return_value=self.data[offset:][:length]))
+
+    def set_blob_metadata(self, metadata: dict):
+        self.metadata = metadata
+
+
+@pytest.fixture
+def fake_blob_client():
+    """Fake blob client returned for every blob."""
+    blob_client = FakeBlobClient()
+    with patch.object(
+        BlobServiceClient, "from_connection_string", return_value=MagicMock()
+    ) as mock_blob_service_client:
+        mock_blob_service_client.return_value.get_blob_client.return_value = blob_client
+        yield blob_client
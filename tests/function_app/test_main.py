@@ -1,3 +1,4 @@
+from os import environ as os_environ
 from unittest.mock import MagicMock, patch
 from uuid import UUID
 
@@ -6,6 +7,7 @@ from azure.data.tables import TableServiceClient, UpdateMode
 from azure.storage.blob import BlobServiceClient
 
 from image_processing_function_app.exceptions import ImageProcessingError
+from image_processing_function_app.profiling import InvocationProfiler
 from v1 import main
 
 
@@ -59,6 +61,9 @@ def test_main(
             "PartitionKey": "PK",
             "RowKey": blob_file_name,
             "BlobName": blob_file_name,
+            "OriginalSize": len(test_image),
+            "StoredSize": len(test_image),
+            "PerceptualHash": "017cffe6f4f1c0e0",
             "make": "Python",
             "exif_ifd_pointer": "57",
             "gps_ifd_pointer": "63",
@@ -67,6 +72,48 @@ def test_main(
     )
 
 
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+@patch("uuid.uuid4", return_value=UUID(int=1))
+def test_main_image_optimization(
+    mock_uuid4: MagicMock,
+    mock_blob_service_client: MagicMock,
+    mock_table_service_client: MagicMock,
+    test_request: func.HttpRequest,
+    test_image: bytes,
+):
+    """Test main function with image optimization enabled."""
+    os_environ["IMAGE_OPTIMIZATION_ENABLED"] = "true"
+    os_environ["IMAGE_OPTIMIZATION_FORMAT"] = "WEBP"
+    os_environ["IMAGE_OPTIMIZATION_QUALITY"] = "50"
+    blob_file_name = str(mock_uuid4.return_value) + ".webp"
+    http_response = main(req=test_request)
+
+    # Test HTTP response status code is 200
+    assert http_response.status_code == 200
+
+    # Test blob name has the extension of the target format
+    mock_blob_service_client.return_value.get_blob_client.assert_called_once_with(
+        container="azure_storage_container_name",
+        blob=blob_file_name,
+    )
+
+    # Test optimized image is uploaded
+    upload_blob = (
+        mock_blob_service_client.return_value.get_blob_client.return_value.upload_blob
+    )
+    stored_image = upload_blob.call_args.kwargs["data"]
+    assert len(stored_image) < len(test_image)
+
+    # Test original and stored size are recorded in table storage
+    entity = mock_table_service_client.return_value.get_table_client.return_value.upsert_entity.call_args.kwargs[
+        "entity"
+    ]
+    assert entity["OriginalSize"] == len(test_image)
+    assert entity["StoredSize"] == len(stored_image)
+    assert entity["make"] == "Python"
+
+
 @patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
 @patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
 @patch("image_processing_function_app.processing.upload_to_blob_storage")
@@ -93,7 +140,7 @@ def test_main_storage_error(
 
 @patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
 @patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
-@patch("image_processing_function_app.processing.insert_table_storage_record")
+@patch("image_processing_function_app.records.insert_table_storage_record")
 def test_main_table_error(
     mock_insert_table_storage_record: MagicMock,
     mock_blob_service_client: MagicMock,
@@ -115,3 +162,117 @@ def test_main_table_error(
     # Test that upload to blob storage happen when table storage error occurs
     mock_blob_service_client.return_value.get_blob_client.return_value.upload_blob.assert_called_once()
     mock_table_service_client.return_value.get_table_client.assert_not_called()
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+@patch("uuid.uuid4", return_value=UUID(int=1))
+def test_main_batched_table_writes(
+    mock_uuid4: MagicMock,
+    mock_blob_service_client: MagicMock,
+    mock_table_service_client: MagicMock,
+    test_request: func.HttpRequest,
+):
+    """Test main function with batched table writes enabled."""
+    os_environ["AZURE_TABLE_BATCH_WRITES"] = "true"
+    blob_file_name = str(mock_uuid4.return_value) + ".jpg"
+    http_response = main(req=test_request)
+
+    # Test HTTP response status code is 200
+    assert http_response.status_code == 200
+
+    # Test record is committed in a transaction before the response is returned
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    operations = table_client.submit_transaction.call_args.kwargs["operations"]
+    assert [operation[1]["RowKey"] for operation in operations] == [blob_file_name]
+    table_client.upsert_entity.assert_not_called()
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+@patch("uuid.uuid4", return_value=UUID(int=1))
+def test_main_profiling(
+    mock_uuid4: MagicMock,
+    mock_blob_service_client: MagicMock,
+    mock_table_service_client: MagicMock,
+    test_image: bytes,
+):
+    """Test main function writes a profiling report when requested by
+    header."""
+    os_environ["PROFILING_HEADER_ENABLED"] = "true"
+    os_environ["PROFILING_CONTAINER_NAME"] = "profiles"
+    http_response = main(
+        req=func.HttpRequest(
+            method="POST",
+            url="http://localhost/api/v1",
+            headers={"X-Profile": "true"},
+            params={},
+            route_params={},
+            body=test_image,
+        )
+    )
+
+    # Test HTTP response status code is 200
+    assert http_response.status_code == 200
+
+    # Test profiling report is written to the profiling container
+    blob_service_client = mock_blob_service_client.return_value
+    assert blob_service_client.get_blob_client.call_args_list[-1].kwargs == {
+        "container": "profiles",
+        "blob": str(mock_uuid4.return_value) + ".profile.txt",
+    }
+    report = (
+        blob_service_client.get_blob_client.return_value.upload_blob.call_args.kwargs[
+            "data"
+        ].decode()
+    )
+    for stage in ["metadata", "hash", "upload", "table"]:
+        assert f"\n{stage} " in report
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+@patch.object(
+    InvocationProfiler, "report", side_effect=Exception("Something went wrong")
+)
+def test_main_profiling_error(
+    mock_report: MagicMock,
+    mock_blob_service_client: MagicMock,
+    mock_table_service_client: MagicMock,
+    test_image: bytes,
+):
+    """Test main function succeeds when the profiling report fails."""
+    os_environ["PROFILING_HEADER_ENABLED"] = "true"
+    http_response = main(
+        req=func.HttpRequest(
+            method="POST",
+            url="http://localhost/api/v1",
+            headers={"X-Profile": "true"},
+            params={},
+            route_params={},
+            body=test_image,
+        )
+    )
+
+    # Test HTTP response status code is 200
+    assert http_response.status_code == 200
+    mock_report.assert_called_once()
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_main_settings_error(
+    mock_blob_service_client: MagicMock,
+    mock_table_service_client: MagicMock,
+    test_request: func.HttpRequest,
+):
+    """Test main function with missing environment variables."""
+    os_environ.pop("AZURE_STORAGE_CONTAINER_NAME")
+    http_response = main(req=test_request)
+
+    # Test HTTP response status code is 500
+    assert http_response.status_code == 500
+
+    # Test that nothing is uploaded when the settings are invalid
+    mock_blob_service_client.return_value.get_blob_client.assert_not_called()
+    mock_table_service_client.return_value.get_table_client.assert_not_called()
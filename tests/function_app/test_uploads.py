@@ -0,0 +1,208 @@
+import json
+from typing import Optional
+from unittest.mock import MagicMock, patch
+from uuid import UUID
+
+import azure.functions as func
+from azure.data.tables import TableServiceClient
+
+from v1_uploads import main
+
+
+def upload_request(
+    method: str,
+    route_params: dict,
+    body: bytes = b"",
+    params: Optional[dict] = None,
+) -> func.HttpRequest:
+    """Creates a request to the resumable upload function."""
+    return func.HttpRequest(
+        method=method,
+        url="http://localhost/api/v1/uploads",
+        headers={},
+        params=params or {},
+        route_params=route_params,
+        body=body,
+    )
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+@patch("uuid.uuid4", return_value=UUID(int=1))
+def test_resumable_upload(
+    mock_uuid4: MagicMock,
+    mock_table_service_client: MagicMock,
+    fake_blob_client,
+    test_image: bytes,
+):
+    """Test initiate, append chunk and finalize of a resumable upload."""
+    upload_id = str(mock_uuid4.return_value)
+    image_chunks = [test_image[:4000], test_image[4000:]]
+
+    # Test upload is initiated
+    http_response = main(req=upload_request("POST", {}))
+    assert http_response.status_code == 201
+    assert json.loads(http_response.get_body()) == {"upload_id": upload_id}
+
+    # Test chunks are staged
+    for index, chunk in enumerate(image_chunks):
+        http_response = main(
+            req=upload_request(
+                "PUT",
+                {"upload_id": upload_id, "action": "chunks", "index": str(index)},
+                body=chunk,
+            )
+        )
+        assert http_response.status_code == 200
+
+    # Test staged chunks are listed
+    http_response = main(req=upload_request("GET", {"upload_id": upload_id}))
+    assert json.loads(http_response.get_body()) == {
+        "upload_id": upload_id,
+        "chunks": [0, 1],
+    }
+
+    # Test upload is finalized
+    http_response = main(
+        req=upload_request(
+            "POST",
+            {"upload_id": upload_id, "action": "finalize"},
+            params={"chunks": "2"},
+        )
+    )
+    assert http_response.status_code == 200
+    assert json.loads(http_response.get_body()) == {
+        "upload_id": upload_id,
+        "blob_name": "uploads/" + upload_id + ".jpg",
+        "size": len(test_image),
+    }
+    assert fake_blob_client.data == test_image
+
+    # Test entity is inserted into table storage with the metadata of the header
+    entity = mock_table_service_client.return_value.get_table_client.return_value.upsert_entity.call_args.kwargs[
+        "entity"
+    ]
+    assert entity["PartitionKey"] == "PK"
+    assert entity["RowKey"] == "uploads-" + upload_id + ".jpg"
+    assert entity["BlobName"] == "uploads/" + upload_id + ".jpg"
+    assert entity["make"] == "Python"
+
+
+@patch("uuid.uuid4", return_value=UUID(int=1))
+def test_resumable_upload_missing_chunks(
+    mock_uuid4: MagicMock, fake_blob_client, test_image: bytes
+):
+    """Test finalize of a resumable upload with missing chunks."""
+    upload_id = str(mock_uuid4.return_value)
+    main(req=upload_request("POST", {}))
+    main(
+        req=upload_request(
+            "PUT",
+            {"upload_id": upload_id, "action": "chunks", "index": "1"},
+            body=test_image,
+        )
+    )
+
+    http_response = main(
+        req=upload_request(
+            "POST",
+            {"upload_id": upload_id, "action": "finalize"},
+            params={"chunks": "2"},
+        )
+    )
+
+    assert http_response.status_code == 400
+    assert http_response.get_body() == b"Missing chunks: 0"
+
+
+def test_resumable_upload_invalid_requests(fake_blob_client):
+    """Test invalid requests to the resumable upload function."""
+    upload_id = str(UUID(int=1))
+
+    assert main(req=upload_request("GET", {})).status_code == 405
+    assert main(req=upload_request("GET", {"upload_id": "invalid"})).status_code == 400
+    assert (
+        main(
+            req=upload_request(
+                "PUT", {"upload_id": upload_id, "action": "chunks", "index": "first"}
+            )
+        ).status_code
+        == 400
+    )
+    assert (
+        main(
+            req=upload_request(
+                "PUT", {"upload_id": upload_id, "action": "chunks", "index": "²"}
+            )
+        ).status_code
+        == 400
+    )
+    assert (
+        main(
+            req=upload_request("POST", {"upload_id": upload_id, "action": "finalize"})
+        ).status_code
+        == 400
+    )
+    assert (
+        main(
+            req=upload_request(
+                "POST",
+                {"upload_id": upload_id, "action": "finalize"},
+                params={"chunks": "²"},
+            )
+        ).status_code
+        == 400
+    )
+    assert (
+        main(
+            req=upload_request("POST", {"upload_id": upload_id, "action": "unknown"})
+        ).status_code
+        == 404
+    )
+
+
+def test_resumable_upload_not_initiated(fake_blob_client, test_image: bytes):
+    """Test a resumable upload that was not initiated cannot replace a blob."""
+    upload_id = str(UUID(int=1))
+    fake_blob_client.upload_blob(data=test_image, blob_type="BlockBlob")
+
+    http_response = main(
+        req=upload_request(
+            "PUT",
+            {"upload_id": upload_id, "action": "chunks", "index": "0"},
+            body=b"example",
+        )
+    )
+    assert http_response.status_code == 400
+    assert http_response.get_body() == f"Unknown upload id: {upload_id}".encode()
+
+    http_response = main(
+        req=upload_request(
+            "POST",
+            {"upload_id": upload_id, "action": "finalize"},
+            params={"chunks": "1"},
+        )
+    )
+    assert http_response.status_code == 400
+    assert fake_blob_client.data == test_image
+
+
+@patch("uuid.uuid4", return_value=UUID(int=1))
+def test_resumable_upload_storage_error(mock_uuid4: MagicMock, fake_blob_client):
+    """Test resumable upload function with blob storage error."""
+    main(req=upload_request("POST", {}))
+    fake_blob_client.stage_block = MagicMock(side_effect=Exception("Went wrong"))
+
+    http_response = main(
+        req=upload_request(
+            "PUT",
+            {
+                "upload_id": str(mock_uuid4.return_value),
+                "action": "chunks",
+                "index": "0",
+            },
+            body=b"example",
+        )
+    )
+
+    assert http_response.status_code == 500
+    assert http_response.get_body() == b"Error occurred while processing image"
@@ -1,11 +1,21 @@
 from unittest.mock import MagicMock, patch
 
 import pytest
+from azure.core.exceptions import ResourceNotFoundError
 from azure.data.tables import TableServiceClient, UpdateMode
-from azure.storage.blob import BlobServiceClient
+from azure.storage.blob import BlobBlock, BlobServiceClient
 
 from image_processing_function_app.connectors.azurestorage import (
+    commit_blob_block_list,
+    download_blob_range,
+    get_blob_block_list,
+    get_blob_metadata,
+    get_blob_service_client,
+    get_table_service_client,
     insert_table_storage_record,
+    set_blob_metadata,
+    stage_blob_block,
+    submit_table_storage_transaction,
     upload_to_blob_storage,
 )
 from image_processing_function_app.exceptions import BlobStorageError, TableStorageError
@@ -53,6 +63,248 @@ def test_upload_to_blob_storage_error(mock_blob_service_client: MagicMock):
         )
 
 
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_stage_blob_block(mock_blob_service_client: MagicMock):
+    """Test stage_blob_block function."""
+    blob_service_client = mock_blob_service_client.return_value
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+
+    stage_blob_block(
+        connection_string="connection_string",
+        container_name="container_name",
+        blob_file_name="blob_file_name",
+        block_id="00000",
+        data=b"example",
+    )
+
+    blob_service_client.get_blob_client.assert_called_once_with(
+        container="container_name",
+        blob="blob_file_name",
+    )
+    blob_client.stage_block.assert_called_once_with(block_id="00000", data=b"example")
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_stage_blob_block_error(mock_blob_service_client: MagicMock):
+    """Test stage_blob_block function with error."""
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+    blob_client.stage_block.side_effect = Exception("Something went wrong")
+
+    with pytest.raises(
+        BlobStorageError,
+        match="Something went wrong",
+    ):
+        stage_blob_block(
+            connection_string="connection_string",
+            container_name="container_name",
+            blob_file_name="blob_file_name",
+            block_id="00000",
+            data=b"example",
+        )
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_get_blob_block_list(mock_blob_service_client: MagicMock):
+    """Test get_blob_block_list function."""
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+    block_list = ([BlobBlock(block_id="00000")], [BlobBlock(block_id="00001")])
+    blob_client.get_block_list.return_value = block_list
+
+    assert (
+        get_blob_block_list(
+            connection_string="connection_string",
+            container_name="container_name",
+            blob_file_name="blob_file_name",
+        )
+        == block_list
+    )
+    blob_client.get_block_list.assert_called_once_with(block_list_type="all")
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_get_blob_block_list_not_found(mock_blob_service_client: MagicMock):
+    """Test get_blob_block_list function when the blob does not exist."""
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+    blob_client.get_block_list.side_effect = ResourceNotFoundError("BlobNotFound")
+
+    assert get_blob_block_list(
+        connection_string="connection_string",
+        container_name="container_name",
+        blob_file_name="blob_file_name",
+    ) == ([], [])
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_get_blob_block_list_error(mock_blob_service_client: MagicMock):
+    """Test get_blob_block_list function with error."""
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+    blob_client.get_block_list.side_effect = Exception("Something went wrong")
+
+    with pytest.raises(
+        BlobStorageError,
+        match="Something went wrong",
+    ):
+        get_blob_block_list(
+            connection_string="connection_string",
+            container_name="container_name",
+            blob_file_name="blob_file_name",
+        )
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_commit_blob_block_list(mock_blob_service_client: MagicMock):
+    """Test commit_blob_block_list function."""
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+
+    commit_blob_block_list(
+        connection_string="connection_string",
+        container_name="container_name",
+        blob_file_name="blob_file_name",
+        block_ids=["00000", "00001"],
+        metadata={"tag": "tag_example"},
+    )
+
+    block_list = blob_client.commit_block_list.call_args.kwargs["block_list"]
+    assert [block.id for block in block_list] == ["00000", "00001"]
+    assert blob_client.commit_block_list.call_args.kwargs["metadata"] == {
+        "tag": "tag_example"
+    }
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_commit_blob_block_list_error(mock_blob_service_client: MagicMock):
+    """Test commit_blob_block_list function with error."""
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+    blob_client.commit_block_list.side_effect = Exception("Something went wrong")
+
+    with pytest.raises(
+        BlobStorageError,
+        match="Something went wrong",
+    ):
+        commit_blob_block_list(
+            connection_string="connection_string",
+            container_name="container_name",
+            blob_file_name="blob_file_name",
+            block_ids=["00000"],
+        )
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_download_blob_range(mock_blob_service_client: MagicMock):
+    """Test download_blob_range function."""
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+    blob_client.download_blob.return_value.readall.return_value = b"example"
+
+    assert (
+        download_blob_range(
+            connection_string="connection_string",
+            container_name="container_name",
+            blob_file_name="blob_file_name",
+            offset=0,
+            length=7,
+        )
+        == b"example"
+    )
+    blob_client.download_blob.assert_called_once_with(offset=0, length=7)
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_download_blob_range_error(mock_blob_service_client: MagicMock):
+    """Test download_blob_range function with error."""
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+    blob_client.download_blob.side_effect = Exception("Something went wrong")
+
+    with pytest.raises(
+        BlobStorageError,
+        match="Something went wrong",
+    ):
+        download_blob_range(
+            connection_string="connection_string",
+            container_name="container_name",
+            blob_file_name="blob_file_name",
+            offset=0,
+            length=7,
+        )
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_set_blob_metadata(mock_blob_service_client: MagicMock):
+    """Test set_blob_metadata function."""
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+
+    set_blob_metadata(
+        connection_string="connection_string",
+        container_name="container_name",
+        blob_file_name="blob_file_name",
+        metadata={"tag": "tag_example"},
+    )
+
+    blob_client.set_blob_metadata.assert_called_once_with(
+        metadata={"tag": "tag_example"}
+    )
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_set_blob_metadata_error(mock_blob_service_client: MagicMock):
+    """Test set_blob_metadata function with error."""
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+    blob_client.set_blob_metadata.side_effect = Exception("Something went wrong")
+
+    with pytest.raises(
+        BlobStorageError,
+        match="Something went wrong",
+    ):
+        set_blob_metadata(
+            connection_string="connection_string",
+            container_name="container_name",
+            blob_file_name="blob_file_name",
+            metadata={"tag": "tag_example"},
+        )
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_get_blob_metadata(mock_blob_service_client: MagicMock):
+    """Test get_blob_metadata function."""
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+    blob_client.get_blob_properties.return_value.metadata = {"key": "value"}
+
+    assert get_blob_metadata(
+        connection_string="connection_string",
+        container_name="container_name",
+        blob_file_name="blob_file_name",
+    ) == {"key": "value"}
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_get_blob_metadata_not_found(mock_blob_service_client: MagicMock):
+    """Test get_blob_metadata function when the blob does not exist."""
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+    blob_client.get_blob_properties.side_effect = ResourceNotFoundError("BlobNotFound")
+
+    assert (
+        get_blob_metadata(
+            connection_string="connection_string",
+            container_name="container_name",
+            blob_file_name="blob_file_name",
+        )
+        == {}
+    )
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_get_blob_metadata_error(mock_blob_service_client: MagicMock):
+    """Test get_blob_metadata function with error."""
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+    blob_client.get_blob_properties.side_effect = Exception("Something went wrong")
+
+    with pytest.raises(BlobStorageError, match="Something went wrong"):
+        get_blob_metadata(
+            connection_string="connection_string",
+            container_name="container_name",
+            blob_file_name="blob_file_name",
+        )
+
+
 @patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
 def test_insert_table_storage_record(mock_table_service_client: MagicMock):
     """Test insert_table_storage_record function."""
@@ -92,3 +344,53 @@ def test_insert_table_storage_error(mock_table_service_client: MagicMock):
             entity={"PartitionKey": "PK", "RowKey": "RK"},
             mode=UpdateMode.MERGE,
         )
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_get_blob_service_client(mock_blob_service_client: MagicMock):
+    """Test get_blob_service_client function reuses the client."""
+    assert get_blob_service_client("connection_string") is get_blob_service_client(
+        "connection_string"
+    )
+    mock_blob_service_client.assert_called_once_with(conn_str="connection_string")
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_get_table_service_client(mock_table_service_client: MagicMock):
+    """Test get_table_service_client function reuses the client."""
+    assert get_table_service_client("connection_string") is get_table_service_client(
+        "connection_string"
+    )
+    mock_table_service_client.assert_called_once_with(conn_str="connection_string")
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_submit_table_storage_transaction(mock_table_service_client: MagicMock):
+    """Test submit_table_storage_transaction function."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    operations = [("upsert", {"PartitionKey": "PK", "RowKey": "RK"})]
+
+    submit_table_storage_transaction(
+        connection_string="connection_string",
+        table_name="table_name",
+        operations=operations,
+    )
+
+    table_client.submit_transaction.assert_called_once_with(operations=operations)
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_submit_table_storage_transaction_error(mock_table_service_client: MagicMock):
+    """Test submit_table_storage_transaction function with error."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    table_client.submit_transaction.side_effect = Exception("Something went wrong")
+
+    with pytest.raises(
+        TableStorageError,
+        match="Something went wrong",
+    ):
+        submit_table_storage_transaction(
+            connection_string="connection_string",
+            table_name="table_name",
+            operations=[("upsert", {"PartitionKey": "PK", "RowKey": "RK"})],
+        )
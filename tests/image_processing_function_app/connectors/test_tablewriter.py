@@ -0,0 +1,228 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Thread
+from unittest.mock import MagicMock, patch
+
+import pytest
+from azure.data.tables import (
+    RequestTooLargeError,
+    TableServiceClient,
+    TableTransactionError,
+    UpdateMode,
+)
+
+from image_processing_function_app.connectors.tablewriter import (
+    BatchedTableWriter,
+    get_batched_table_writer,
+)
+from image_processing_function_app.exceptions import TableStorageError
+
+
+def entity(partition_key: str, row_key: str) -> dict:
+    """Creates an entity."""
+    return {"PartitionKey": partition_key, "RowKey": row_key}
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_batched_table_writer(mock_table_service_client: MagicMock):
+    """Test BatchedTableWriter coalesces concurrent writes per partition
+    key."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    writer = BatchedTableWriter(
+        connection_string="connection_string",
+        table_name="table_name",
+        max_delay=0.1,
+    )
+
+    entities = [entity("PK1", f"RK{i}") for i in range(10)] + [entity("PK2", "RK")]
+    with ThreadPoolExecutor(max_workers=len(entities)) as executor:
+        list(executor.map(writer.write, entities))
+    writer.close()
+
+    # Test one transaction is submitted per partition key
+    assert table_client.submit_transaction.call_count == 2
+    operations = sorted(
+        (
+            call.kwargs["operations"]
+            for call in table_client.submit_transaction.call_args_list
+        ),
+        key=len,
+    )
+    assert operations[0] == [
+        ("upsert", entity("PK2", "RK"), {"mode": UpdateMode.MERGE})
+    ]
+    assert sorted(operation[1]["RowKey"] for operation in operations[1]) == sorted(
+        f"RK{i}" for i in range(10)
+    )
+    table_client.upsert_entity.assert_not_called()
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_batched_table_writer_chunks(mock_table_service_client: MagicMock):
+    """Test BatchedTableWriter splits batches by size and duplicate row
+    keys."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    writer = BatchedTableWriter(
+        connection_string="connection_string",
+        table_name="table_name",
+        max_batch_size=2,
+        max_delay=60,
+    )
+
+    futures = [writer.submit(entity("PK", row_key)) for row_key in ["a", "b", "c", "c"]]
+    writer.close()
+
+    assert all(future.result() is None for future in futures)
+    assert [
+        [operation[1]["RowKey"] for operation in call.kwargs["operations"]]
+        for call in table_client.submit_transaction.call_args_list
+    ] == [["a", "b"], ["c"], ["c"]]
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_batched_table_writer_transaction_error(mock_table_service_client: MagicMock):
+    """Test BatchedTableWriter fails the entity that failed a transaction and
+    submits the others again."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    table_client.submit_transaction.side_effect = [
+        TableTransactionError(message="1:Something went wrong"),
+        None,
+    ]
+    writer = BatchedTableWriter(
+        connection_string="connection_string",
+        table_name="table_name",
+        max_delay=60,
+    )
+
+    futures = [writer.submit(entity("PK", row_key)) for row_key in ["a", "b", "c"]]
+    writer.close()
+
+    assert futures[0].result() is None
+    with pytest.raises(TableStorageError, match="Something went wrong"):
+        futures[1].result()
+    assert futures[2].result() is None
+    assert [
+        [operation[1]["RowKey"] for operation in call.kwargs["operations"]]
+        for call in table_client.submit_transaction.call_args_list
+    ] == [["a", "b", "c"], ["a", "c"]]
+    table_client.upsert_entity.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ConnectionError("Something went wrong"),
+        RequestTooLargeError(message="Something went wrong"),
+    ],
+)
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_batched_table_writer_chunk_error(
+    mock_table_service_client: MagicMock, error: Exception
+):
+    """Test BatchedTableWriter fails all entities of a transaction that did not
+    fail on one entity."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    table_client.reset_mock()
+    table_client.submit_transaction.side_effect = error
+    writer = BatchedTableWriter(
+        connection_string="connection_string",
+        table_name="table_name",
+        max_delay=60,
+    )
+
+    futures = [writer.submit(entity("PK", row_key)) for row_key in ["a", "b"]]
+    writer.close()
+
+    for future in futures:
+        with pytest.raises(TableStorageError, match="Something went wrong"):
+            future.result()
+    assert table_client.submit_transaction.call_count == 1
+    table_client.upsert_entity.assert_not_called()
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_batched_table_writer_write_error(mock_table_service_client: MagicMock):
+    """Test BatchedTableWriter write raises when the entity is not
+    committed."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    table_client.submit_transaction.side_effect = Exception("Something went wrong")
+    writer = BatchedTableWriter(
+        connection_string="connection_string",
+        table_name="table_name",
+    )
+
+    with pytest.raises(TableStorageError, match="Something went wrong"):
+        writer.write(entity("PK", "RK"))
+    table_client.upsert_entity.assert_not_called()
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_batched_table_writer_invalid_entity(mock_table_service_client: MagicMock):
+    """Test BatchedTableWriter fails the batch of an invalid entity only."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    writer = BatchedTableWriter(
+        connection_string="connection_string",
+        table_name="table_name",
+        max_delay=60,
+    )
+
+    valid = writer.submit(entity("PK1", "RK"))
+    invalid = writer.submit({"PartitionKey": "PK2"})
+    writer.close()
+
+    assert valid.result(timeout=1) is None
+    with pytest.raises(TableStorageError, match="RowKey"):
+        invalid.result(timeout=1)
+    assert table_client.submit_transaction.call_count == 1
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_batched_table_writer_restarts_thread(mock_table_service_client: MagicMock):
+    """Test BatchedTableWriter restarts the background thread when it has
+    died."""
+    writer = BatchedTableWriter(
+        connection_string="connection_string",
+        table_name="table_name",
+    )
+    writer._thread = Thread(target=lambda: None)
+    writer._thread.start()
+    writer._thread.join()
+
+    writer.write(entity("PK", "RK"), timeout=1)
+    writer.close()
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_batched_table_writer_timeout(mock_table_service_client: MagicMock):
+    """Test BatchedTableWriter write raises when the entity is not written in
+    time."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    release = Event()
+    table_client.submit_transaction.side_effect = lambda **kwargs: release.wait()
+    writer = BatchedTableWriter(
+        connection_string="connection_string",
+        table_name="table_name",
+    )
+
+    with pytest.raises(TableStorageError, match="not written within 0.01 seconds"):
+        writer.write(entity("PK", "RK"), timeout=0.01)
+    release.set()
+    writer.close()
+
+
+def test_batched_table_writer_closed():
+    """Test BatchedTableWriter does not accept entities when it is closed."""
+    writer = BatchedTableWriter(
+        connection_string="connection_string",
+        table_name="table_name",
+    )
+    writer.close()
+
+    with pytest.raises(TableStorageError, match="The table writer is closed."):
+        writer.write(entity("PK", "RK"))
+
+
+def test_get_batched_table_writer():
+    """Test get_batched_table_writer function reuses the writer."""
+    assert get_batched_table_writer(
+        "connection_string", "table_name"
+    ) is get_batched_table_writer("connection_string", "table_name")
@@ -0,0 +1,94 @@
+from io import BytesIO
+
+import pytest
+from exif import Image
+from PIL import Image as PILImage
+from PIL import ImageCms
+
+from image_processing_function_app.exceptions import OptimizationError
+from image_processing_function_app.optimization import optimize_image
+
+
+def test_optimize_image(test_image: bytes):
+    """Test optimize_image function."""
+    result = optimize_image(binary_image=test_image)
+
+    assert result.image_format == "JPEG"
+    assert result.file_extension == ".jpg"
+    assert result.original_size == len(test_image)
+    assert result.stored_size == len(result.data)
+    assert result.stored_size < result.original_size
+
+    # Test selected EXIF tags are kept
+    assert Image(result.data).make == "Python"
+
+
+def test_optimize_image_icc_profile(test_image: bytes):
+    """Test optimize_image function keeps the ICC profile."""
+    icc_profile = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+    output = BytesIO()
+    PILImage.open(BytesIO(test_image)).save(
+        output, format="JPEG", quality=95, icc_profile=icc_profile
+    )
+
+    for quality in (None, 50):
+        result = optimize_image(binary_image=output.getvalue(), quality=quality)
+
+        assert result.stored_size < len(output.getvalue())
+        assert PILImage.open(BytesIO(result.data)).info["icc_profile"] == icc_profile
+
+
+def test_optimize_image_mpo(test_image: bytes):
+    """Test optimize_image function with a multi-picture (MPO) JPEG."""
+    image = PILImage.open(BytesIO(test_image))
+    output = BytesIO()
+    image.save(
+        output, format="MPO", save_all=True, append_images=[image.copy()], quality=95
+    )
+    mpo_image = PILImage.open(BytesIO(output.getvalue()))
+    assert mpo_image.format == "MPO"
+
+    for image_format in (None, "JPEG"):
+        result = optimize_image(
+            binary_image=output.getvalue(), image_format=image_format
+        )
+
+        assert result.image_format == "JPEG"
+        assert result.stored_size < len(output.getvalue())
+        # Test the quantization tables of the original are kept
+        assert (
+            PILImage.open(BytesIO(result.data)).quantization == mpo_image.quantization
+        )
+
+
+def test_optimize_image_transcode(test_image: bytes):
+    """Test optimize_image function with target format and quality."""
+    result = optimize_image(binary_image=test_image, image_format="webp", quality=50)
+
+    assert result.image_format == "WEBP"
+    assert result.file_extension == ".webp"
+    assert result.stored_size < result.original_size
+    assert PILImage.open(BytesIO(result.data)).format == "WEBP"
+
+
+def test_optimize_image_larger(test_image: bytes):
+    """Test optimize_image function keeps the original when it is not
+    smaller."""
+    result = optimize_image(binary_image=test_image, quality=100)
+
+    assert result.data == test_image
+    assert result.stored_size == result.original_size
+
+
+def test_optimize_image_unsupported_format(test_image: bytes):
+    """Test optimize_image function with unsupported format."""
+    with pytest.raises(
+        OptimizationError, match="Failed to optimize image: Unsupported image format"
+    ):
+        optimize_image(binary_image=test_image, image_format="TIFF")
+
+
+def test_optimize_image_empty_image():
+    """Test optimize_image function with empty image."""
+    with pytest.raises(OptimizationError, match="Failed to optimize image"):
+        optimize_image(binary_image=b"")
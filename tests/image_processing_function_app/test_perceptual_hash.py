@@ -0,0 +1,251 @@
+import random
+from datetime import datetime, timezone
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+from azure.data.tables import TableEntity, TableServiceClient
+from PIL import Image as PILImage
+
+from image_processing_function_app.exceptions import (
+    PerceptualHashError,
+    TableStorageError,
+)
+from image_processing_function_app.perceptual_hash import (
+    NearDuplicateIndex,
+    dhash,
+    hamming_distance,
+)
+
+
+def table_entity(row_key: str, perceptual_hash: str, timestamp: datetime):
+    """Creates a TableEntity as returned by a query."""
+    entity = TableEntity(RowKey=row_key, PerceptualHash=perceptual_hash)
+    entity._metadata = {"timestamp": timestamp}
+    return entity
+
+
+def test_dhash(test_image: bytes):
+    """Test dhash function."""
+    assert dhash(binary_image=test_image) == 0x017CFFE6F4F1C0E0
+
+
+def test_dhash_resized_image(test_image: bytes):
+    """Test dhash function is robust to resizing and recompression."""
+    output = BytesIO()
+    PILImage.open(BytesIO(test_image)).resize((137, 91)).save(
+        output, format="JPEG", quality=40
+    )
+
+    assert (
+        hamming_distance(dhash(binary_image=test_image), dhash(output.getvalue())) <= 4
+    )
+
+
+def test_dhash_hash_size(test_image: bytes):
+    """Test dhash function with a different hash size."""
+    assert dhash(binary_image=test_image, hash_size=16).bit_length() <= 256
+
+
+def test_dhash_empty_image():
+    """Test dhash function with empty image."""
+    with pytest.raises(PerceptualHashError, match="Failed to compute perceptual hash"):
+        dhash(binary_image=b"")
+
+
+def test_hamming_distance():
+    """Test hamming_distance function."""
+    assert hamming_distance(0b1011, 0b1011) == 0
+    assert hamming_distance(0b1011, 0b0110) == 3
+
+
+def test_near_duplicate_index():
+    """Test NearDuplicateIndex search."""
+    index = NearDuplicateIndex()
+    assert index.search(0b0000, max_distance=4) == []
+
+    assert index.add("a", 0b0000)
+    assert index.add("b", 0b0001)
+    assert index.add("c", 0b0011)
+    assert index.add("d", 0b1111)
+    assert index.add("e", 0b0000)
+    assert not index.add("a", 0b1111)
+
+    assert len(index) == 5
+    assert "d" in index
+    assert index.search(0b0000, max_distance=0) == [("a", 0), ("e", 0)]
+    assert sorted(index.search(0b0000, max_distance=2)) == [
+        ("a", 0),
+        ("b", 1),
+        ("c", 2),
+        ("e", 0),
+    ]
+    assert index.search(0b0111, max_distance=1) == [("c", 1), ("d", 1)]
+
+
+@pytest.mark.parametrize("max_tail_size", [16, 8192])
+def test_near_duplicate_index_matches_linear_search(max_tail_size: int):
+    """Test NearDuplicateIndex returns the same results as a linear search."""
+    rng = random.Random(0)
+    hashes = {str(i): (i * 0x9E3779B97F4A7C15) % 2**64 for i in range(500)}
+    # Add near-duplicates, which differ in a few random bits
+    for i in range(500):
+        perceptual_hash = hashes[str(i)]
+        for _ in range(rng.randrange(16)):
+            perceptual_hash ^= 1 << rng.randrange(64)
+        hashes[f"{i}-near"] = perceptual_hash
+    index = NearDuplicateIndex()
+    for key, perceptual_hash in hashes.items():
+        index.add(key, perceptual_hash)
+
+    with patch(
+        "image_processing_function_app.perceptual_hash.MAX_TAIL_SIZE", max_tail_size
+    ):
+        results = {
+            (query, max_distance): index.search(query, max_distance=max_distance)
+            for query in list(hashes.values())[:20]
+            for max_distance in (0, 3, 4, 8, 11, 12, 24)
+        }
+
+    for query in list(hashes.values())[:20]:
+        for max_distance in (0, 3, 4, 8, 11, 12, 24):
+            expected = sorted(
+                (
+                    (key, hamming_distance(perceptual_hash, query))
+                    for key, perceptual_hash in hashes.items()
+                    if hamming_distance(perceptual_hash, query) <= max_distance
+                ),
+                key=lambda result: (result[1], result[0]),
+            )
+            assert results[(query, max_distance)] == expected
+
+
+def test_near_duplicate_index_add_after_search():
+    """Test NearDuplicateIndex finds hashes added after a search."""
+    index = NearDuplicateIndex()
+    index.add("a", 0x00000000FFFFFFFF)
+    assert index.search(0x00000000FFFFFFFE, max_distance=1) == [("a", 1)]
+
+    for i in range(2000):
+        index.add(str(i), 0xFFFFFFFF00000000 + i)
+    # The hashes within distance 1 are the query and those with a single bit set
+    assert index.search(0xFFFFFFFF00000000, max_distance=1) == [("0", 0)] + sorted(
+        (str(1 << bit), 1) for bit in range(11)
+    )
+
+
+@patch("image_processing_function_app.perceptual_hash.MAX_TAIL_SIZE", 4)
+def test_near_duplicate_index_add_and_search():
+    """Test NearDuplicateIndex finds hashes when adds and searches
+    interleave."""
+    rng = random.Random(0)
+    index = NearDuplicateIndex()
+    hashes: dict[str, int] = {}
+    for i in range(200):
+        perceptual_hash = rng.getrandbits(64)
+        # Test each hash is found before it is added, by a near-duplicate
+        query = perceptual_hash ^ (1 << rng.randrange(64))
+        expected = sorted(
+            (key, hamming_distance(value, query))
+            for key, value in hashes.items()
+            if hamming_distance(value, query) <= 10
+        )
+        assert sorted(index.search(query, max_distance=10)) == expected
+
+        index.add(str(i), perceptual_hash)
+        hashes[str(i)] = perceptual_hash
+        assert (str(i), 1) in index.search(query, max_distance=10)
+
+    # Test the tail is merged into the substring tables
+    assert index._tables_size > len(index) - 4
+    assert all(len(values) == index._tables_size for values, _ in index._tables)
+
+
+def test_near_duplicate_index_invalid_hash():
+    """Test NearDuplicateIndex rejects hashes that are not 64-bit."""
+    index = NearDuplicateIndex()
+    with pytest.raises(PerceptualHashError, match="64-bit unsigned integer"):
+        index.add("a", 1 << 64)
+    with pytest.raises(PerceptualHashError, match="64-bit unsigned integer"):
+        index.add("a", -1)
+    assert "a" not in index
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_near_duplicate_index_update_from_table(mock_table_service_client: MagicMock):
+    """Test NearDuplicateIndex is updated incrementally from table storage."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    first_timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    second_timestamp = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    table_client.query_entities.return_value = [
+        table_entity("a.jpg", "0000000000000000", first_timestamp),
+        table_entity("b.jpg", "0000000000000003", second_timestamp),
+    ]
+
+    index = NearDuplicateIndex()
+    assert index.update_from_table("connection_string", "table_name") == 2
+    assert index.last_timestamp == second_timestamp
+    table_client.query_entities.assert_called_once_with(
+        query_filter="PerceptualHash ne ''",
+        select=["RowKey", "PerceptualHash", "Timestamp"],
+        parameters=None,
+    )
+
+    # Test only records changed since the last update are queried
+    table_client.query_entities.return_value = [
+        table_entity("b.jpg", "0000000000000003", second_timestamp),
+        table_entity("c.jpg", "ffffffffffffffff", second_timestamp),
+    ]
+    assert index.update_from_table("connection_string", "table_name") == 1
+    table_client.query_entities.assert_called_with(
+        query_filter="PerceptualHash ne '' and Timestamp ge @last_timestamp",
+        select=["RowKey", "PerceptualHash", "Timestamp"],
+        parameters={"last_timestamp": second_timestamp},
+    )
+    assert index.search(0, max_distance=2) == [("a.jpg", 0), ("b.jpg", 2)]
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_near_duplicate_index_update_from_table_malformed_hash(
+    mock_table_service_client: MagicMock,
+):
+    """Test NearDuplicateIndex skips records with a malformed hash."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    first_timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    second_timestamp = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    table_client.query_entities.return_value = [
+        table_entity("a.jpg", "not a hash", first_timestamp),
+        table_entity("b.jpg", "0000000000000003", first_timestamp),
+        table_entity("c.jpg", "10000000000000000", second_timestamp),
+    ]
+    logger = MagicMock()
+
+    index = NearDuplicateIndex()
+    assert index.update_from_table("connection_string", "table_name", logger) == 1
+    assert index.last_timestamp == second_timestamp
+    assert "a.jpg" not in index
+    assert "b.jpg" in index
+    assert "c.jpg" not in index
+    assert logger.warning.call_count == 2
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_near_duplicate_index_update_from_table_error(
+    mock_table_service_client: MagicMock,
+):
+    """Test NearDuplicateIndex keeps last_timestamp after a failed update."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    first_timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    second_timestamp = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+    def query_entities(**kwargs):
+        yield table_entity("b.jpg", "0000000000000003", second_timestamp)
+        raise ConnectionError("Connection reset")
+
+    index = NearDuplicateIndex()
+    index.last_timestamp = first_timestamp
+    table_client.query_entities.side_effect = query_entities
+    with pytest.raises(TableStorageError, match="Connection reset"):
+        index.update_from_table("connection_string", "table_name")
+
+    assert index.last_timestamp == first_timestamp
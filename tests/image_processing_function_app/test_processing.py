@@ -32,6 +32,61 @@ def test_from_empty_http_request(empty_request: func.HttpRequest):
     )
 
 
+def test_optimize_image(test_request: func.HttpRequest, test_image: bytes):
+    """Test optimize_image method."""
+    img_proc_func_request = ImageProcessingFunctionRequest.from_http_request(
+        req=test_request
+    )
+    img_proc_func_request.optimize_image(image_format="WEBP", quality=50)
+
+    assert img_proc_func_request.file_extension == ".webp"
+    assert img_proc_func_request.original_size == len(test_image)
+    assert img_proc_func_request.stored_size < len(test_image)
+
+    # Test metadata of the original image is kept
+    assert img_proc_func_request.metadata == Metadata(
+        make="Python",
+        exif_ifd_pointer="57",
+        gps_ifd_pointer="63",
+    )
+
+
+def test_optimize_empty_image(empty_request: func.HttpRequest):
+    """Test optimize_image method with empty request."""
+    img_proc_func_request = ImageProcessingFunctionRequest.from_http_request(
+        req=empty_request
+    )
+    img_proc_func_request.optimize_image()
+
+    assert img_proc_func_request.body == b""
+    assert img_proc_func_request.file_extension == ".jpg"
+
+
+def test_perceptual_hash(test_request: func.HttpRequest):
+    """Test perceptual hash is computed from the request."""
+    img_proc_func_request = ImageProcessingFunctionRequest.from_http_request(
+        req=test_request
+    )
+    assert img_proc_func_request.perceptual_hash is None
+    img_proc_func_request.compute_perceptual_hash()
+
+    assert img_proc_func_request.perceptual_hash == 0x017CFFE6F4F1C0E0
+    assert img_proc_func_request.perceptual_hash_dict == {
+        "PerceptualHash": "017cffe6f4f1c0e0"
+    }
+
+
+def test_perceptual_hash_empty_request(empty_request: func.HttpRequest):
+    """Test perceptual hash with empty request."""
+    img_proc_func_request = ImageProcessingFunctionRequest.from_http_request(
+        req=empty_request
+    )
+    img_proc_func_request.compute_perceptual_hash()
+
+    assert img_proc_func_request.perceptual_hash is None
+    assert img_proc_func_request.perceptual_hash_dict == {}
+
+
 @patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
 def test_upload_to_blob_storage(
     mock_blob_service_client: MagicMock,
@@ -92,14 +147,17 @@ def test_upload_to_blob_storage_error(
 def test_insert_table_storage_record(
     mock_table_service_client: MagicMock,
     test_request: func.HttpRequest,
+    test_image: bytes,
 ):
     """Test insert_table_storage_record method."""
     table_service_client = mock_table_service_client.return_value
     table_client = mock_table_service_client.return_value.get_table_client.return_value
 
-    ImageProcessingFunctionRequest.from_http_request(
+    img_proc_func_request = ImageProcessingFunctionRequest.from_http_request(
         req=test_request
-    ).insert_table_storage_record(
+    )
+    img_proc_func_request.compute_perceptual_hash()
+    img_proc_func_request.insert_table_storage_record(
         connection_string="connection_string",
         table_name="table_name",
         blob_file_name="blob_file_name",
@@ -115,6 +173,9 @@ def test_insert_table_storage_record(
             "PartitionKey": "PK",
             "RowKey": "RK",
             "BlobName": "blob_file_name",
+            "OriginalSize": len(test_image),
+            "StoredSize": len(test_image),
+            "PerceptualHash": "017cffe6f4f1c0e0",
             "make": "Python",
             "exif_ifd_pointer": "57",
             "gps_ifd_pointer": "63",
@@ -123,6 +184,59 @@ def test_insert_table_storage_record(
     )
 
 
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_insert_table_storage_record_batched(
+    mock_table_service_client: MagicMock,
+    test_request: func.HttpRequest,
+):
+    """Test insert_table_storage_record method with batched writes."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+
+    ImageProcessingFunctionRequest.from_http_request(
+        req=test_request
+    ).insert_table_storage_record(
+        connection_string="connection_string",
+        table_name="table_name",
+        blob_file_name="blob_file_name",
+        partition_key="PK",
+        row_key="RK",
+        batched=True,
+    )
+
+    # Test the record is committed in a transaction before the method returns
+    operations = table_client.submit_transaction.call_args.kwargs["operations"]
+    assert [(operation[0], operation[1]["RowKey"]) for operation in operations] == [
+        ("upsert", "RK")
+    ]
+    table_client.upsert_entity.assert_not_called()
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_insert_table_storage_record_batched_error(
+    mock_table_service_client: MagicMock,
+    test_request: func.HttpRequest,
+):
+    """Test insert_table_storage_record method with batched writes and
+    error."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    table_client.submit_transaction.side_effect = Exception("Something went wrong")
+
+    with pytest.raises(
+        ImageProcessingError,
+        match="Failed to insert record to table storage.",
+    ):
+        ImageProcessingFunctionRequest.from_http_request(
+            req=test_request
+        ).insert_table_storage_record(
+            connection_string="connection_string",
+            table_name="table_name",
+            blob_file_name="blob_file_name",
+            partition_key="PK",
+            row_key="RK",
+            batched=True,
+        )
+
+
 @patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
 def test_insert_table_storage_record_error(
     mock_table_service_client: MagicMock,
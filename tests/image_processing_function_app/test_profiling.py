@@ -0,0 +1,215 @@
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from logging import getLogger
+from threading import Barrier, Event
+from unittest.mock import MagicMock, patch
+
+import pytest
+from azure.storage.blob import BlobServiceClient
+
+from image_processing_function_app.profiling import (
+    NULL_PROFILER,
+    InvocationProfiler,
+    get_profiler,
+    is_sampled,
+    write_profile_report,
+)
+from image_processing_function_app.settings import Settings
+
+SETTINGS = Settings(
+    azure_storage_connection_string="azure_storage_connection_string",
+    azure_storage_container_name="azure_storage_container_name",
+    azure_table_connection_string="table_connection_string",
+    azure_table_name="table_name",
+    azure_table_partition_key="PK",
+)
+
+
+def test_invocation_profiler():
+    """Test InvocationProfiler attributes time and allocations to stages."""
+    sink = MagicMock()
+
+    with InvocationProfiler(name="invocation", sink=sink) as profiler:
+        with profiler.stage("allocate"):
+            data = [bytes(1024) for _ in range(100)]
+        with profiler.stage("compute"):
+            sum(range(10000))
+
+    assert [stage.name for stage in profiler.stages] == ["allocate", "compute"]
+    assert profiler.stages[0].allocated >= 100 * 1024
+    assert profiler.stages[0].peak >= profiler.stages[0].allocated
+    assert not tracemalloc.is_tracing()
+    assert len(data) == 100
+
+    # Test report is written to the sink
+    name, report = sink.call_args.args
+    assert name == "invocation"
+    assert "Profile of invocation invocation" in report
+    assert "allocate" in report
+    assert "Top allocations:" in report
+    assert "function calls" in report
+
+
+def test_invocation_profiler_concurrent():
+    """Test InvocationProfiler traces memory until the last concurrent
+    invocation exits."""
+    sink = MagicMock()
+    barrier = Barrier(2)
+    first_exited = Event()
+
+    def invocation(name: str) -> InvocationProfiler:
+        with InvocationProfiler(name=name, sink=sink) as profiler:
+            with profiler.stage("concurrent"):
+                barrier.wait(timeout=5)
+            if name == "second":
+                assert first_exited.wait(timeout=5)
+                with profiler.stage("allocate"):
+                    data = [bytes(1024) for _ in range(100)]
+                assert len(data) == 100
+        if name == "first":
+            first_exited.set()
+        return profiler
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first, second = executor.map(invocation, ["first", "second"])
+
+    assert sorted(call.args[0] for call in sink.call_args_list) == ["first", "second"]
+    assert second.stages[1].allocated >= 100 * 1024
+    assert "Top allocations:" in sink.call_args_list[1].args[1]
+    assert not tracemalloc.is_tracing()
+
+
+def test_invocation_profiler_tracing_started():
+    """Test InvocationProfiler does not stop tracemalloc it did not start."""
+    tracemalloc.start()
+    try:
+        with InvocationProfiler(name="invocation", sink=MagicMock()):
+            pass
+
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_invocation_profiler_sink_error():
+    """Test InvocationProfiler logs a warning when the report is not
+    written."""
+    sink = MagicMock(side_effect=Exception("Something went wrong"))
+    logger = MagicMock(wraps=getLogger(__name__))
+
+    with InvocationProfiler(name="invocation", sink=sink, logger=logger):
+        pass
+
+    logger.warning.assert_called_once_with(
+        "Failed to write profiling report: Something went wrong"
+    )
+    assert not tracemalloc.is_tracing()
+
+
+def test_null_profiler():
+    """Test NULL_PROFILER does not profile."""
+    with NULL_PROFILER as profiler:
+        with profiler.stage("stage"):
+            pass
+
+    assert profiler.sampled is False
+    assert not tracemalloc.is_tracing()
+
+
+@pytest.mark.parametrize(
+    "headers, settings, sampled",
+    [
+        ({}, SETTINGS, False),
+        ({"X-Profile": "true"}, SETTINGS, False),
+        (
+            {"X-Profile": "true"},
+            replace(SETTINGS, profiling_header_enabled=True),
+            True,
+        ),
+        (
+            {"X-Profile": "false"},
+            replace(SETTINGS, profiling_header_enabled=True),
+            False,
+        ),
+        ({}, replace(SETTINGS, profiling_sample_rate=100), True),
+    ],
+)
+def test_is_sampled(headers: dict, settings: Settings, sampled: bool):
+    """Test is_sampled function."""
+    assert is_sampled(headers=headers, settings=settings) is sampled
+
+
+@patch("image_processing_function_app.profiling.random.random", return_value=0.25)
+def test_is_sampled_rate(mock_random: MagicMock):
+    """Test is_sampled function samples a percentage of the invocations."""
+    assert is_sampled(
+        headers={},
+        settings=replace(SETTINGS, profiling_sample_rate=30),
+    )
+    assert not is_sampled(
+        headers={},
+        settings=replace(SETTINGS, profiling_sample_rate=20),
+    )
+
+
+def test_get_profiler():
+    """Test get_profiler function."""
+    assert get_profiler(headers={}, settings=SETTINGS, name="name") is NULL_PROFILER
+    assert isinstance(
+        get_profiler(
+            headers={},
+            settings=replace(SETTINGS, profiling_sample_rate=100),
+            name="name",
+        ),
+        InvocationProfiler,
+    )
+
+
+def test_write_profile_report_log():
+    """Test write_profile_report function writes to the log."""
+    logger = MagicMock()
+
+    write_profile_report(name="name", report="report", settings=SETTINGS, logger=logger)
+
+    logger.info.assert_called_once_with("report")
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_write_profile_report_blob(mock_blob_service_client: MagicMock):
+    """Test write_profile_report function writes to blob storage."""
+    blob_service_client = mock_blob_service_client.return_value
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+
+    write_profile_report(
+        name="name",
+        report="report",
+        settings=replace(SETTINGS, profiling_container_name="profiles"),
+    )
+
+    blob_service_client.get_blob_client.assert_called_once_with(
+        container="profiles",
+        blob="name.profile.txt",
+    )
+    blob_client.upload_blob.assert_called_once_with(
+        data=b"report", blob_type="BlockBlob", metadata=None
+    )
+
+
+@patch.object(BlobServiceClient, "from_connection_string", return_value=MagicMock())
+def test_write_profile_report_blob_error(mock_blob_service_client: MagicMock):
+    """Test write_profile_report function logs a warning when writing fails."""
+    blob_client = mock_blob_service_client.return_value.get_blob_client.return_value
+    blob_client.upload_blob.side_effect = Exception("Something went wrong")
+    logger = MagicMock(wraps=getLogger(__name__))
+
+    write_profile_report(
+        name="name",
+        report="report",
+        settings=replace(SETTINGS, profiling_container_name="profiles"),
+        logger=logger,
+    )
+
+    logger.warning.assert_called_once_with(
+        "Failed to write profiling report: Something went wrong"
+    )
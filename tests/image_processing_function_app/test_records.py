@@ -0,0 +1,54 @@
+from unittest.mock import MagicMock, patch
+
+from image_processing_function_app.metadata import METADATA_DEFAULT, Metadata
+from image_processing_function_app.records import ImageRecord
+
+
+def test_image_record():
+    """Test ImageRecord defaults."""
+    record = ImageRecord()
+
+    assert record.original_size == 0
+    assert record.stored_size == 0
+    assert record.metadata == METADATA_DEFAULT
+    assert record.perceptual_hash_dict == {}
+
+    record.perceptual_hash = 0x017CFFE6F4F1C0E0
+    assert record.perceptual_hash_dict == {"PerceptualHash": "017cffe6f4f1c0e0"}
+
+
+def test_get_metadata(test_image: bytes):
+    """Test _get_metadata method."""
+    assert ImageRecord()._get_metadata(binary_image=test_image) == Metadata(
+        make="Python",
+        exif_ifd_pointer="57",
+        gps_ifd_pointer="63",
+    )
+
+
+def test_get_metadata_error():
+    """Test _get_metadata method logs a warning when there is no metadata."""
+    logger = MagicMock()
+
+    assert ImageRecord(logger=logger)._get_metadata(b"") == METADATA_DEFAULT
+    logger.warning.assert_called_once()
+
+
+@patch("image_processing_function_app.records.get_batched_table_writer")
+def test_insert_table_storage_record_batched(mock_get_batched_table_writer: MagicMock):
+    """Test insert_table_storage_record waits write_timeout seconds for a
+    batched write."""
+    ImageRecord().insert_table_storage_record(
+        connection_string="connection_string",
+        table_name="table_name",
+        blob_file_name="blob.jpg",
+        partition_key="PK",
+        row_key="blob.jpg",
+        batched=True,
+        write_timeout=5.0,
+    )
+
+    write = mock_get_batched_table_writer.return_value.write
+    write.assert_called_once()
+    assert write.call_args.kwargs["timeout"] == 5.0
+    assert write.call_args.kwargs["entity"]["RowKey"] == "blob.jpg"
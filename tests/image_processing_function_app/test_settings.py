@@ -0,0 +1,110 @@
+from os import environ as os_environ
+
+import pytest
+
+from image_processing_function_app.exceptions import SettingsError
+from image_processing_function_app.settings import Settings, get_settings
+
+ENV = {
+    "AZURE_STORAGE_CONNECTION_STRING": "azure_storage_connection_string",
+    "AZURE_STORAGE_CONTAINER_NAME": "azure_storage_container_name",
+    "AZURE_TABLE_CONNECTION_STRING": "table_connection_string",
+    "AZURE_TABLE_NAME": "table_name",
+    "AZURE_TABLE_PARTITION_KEY": "PK",
+}
+
+
+def test_settings_from_env():
+    """Test from_env method."""
+    assert Settings.from_env(env=ENV) == Settings(
+        azure_storage_connection_string="azure_storage_connection_string",
+        azure_storage_container_name="azure_storage_container_name",
+        azure_table_connection_string="table_connection_string",
+        azure_table_name="table_name",
+        azure_table_partition_key="PK",
+        azure_table_batch_writes=False,
+        image_optimization_enabled=False,
+        image_optimization_format=None,
+        image_optimization_quality=None,
+        profiling_header_enabled=False,
+        profiling_sample_rate=0.0,
+        profiling_container_name=None,
+    )
+
+
+def test_settings_from_env_image_optimization():
+    """Test from_env method with image optimization settings."""
+    settings = Settings.from_env(
+        env={
+            **ENV,
+            "IMAGE_OPTIMIZATION_ENABLED": "True",
+            "IMAGE_OPTIMIZATION_FORMAT": "webp",
+            "IMAGE_OPTIMIZATION_QUALITY": "75",
+        }
+    )
+
+    assert settings.image_optimization_enabled is True
+    assert settings.image_optimization_format == "WEBP"
+    assert settings.image_optimization_quality == 75
+
+
+def test_settings_from_env_azure_table_batch_writes():
+    """Test from_env method with batched table writes."""
+    settings = Settings.from_env(env={**ENV, "AZURE_TABLE_BATCH_WRITES": "true"})
+
+    assert settings.azure_table_batch_writes is True
+
+
+def test_settings_from_env_profiling():
+    """Test from_env method with profiling settings."""
+    settings = Settings.from_env(
+        env={
+            **ENV,
+            "PROFILING_HEADER_ENABLED": "true",
+            "PROFILING_SAMPLE_RATE": "0.5",
+            "PROFILING_CONTAINER_NAME": "profiles",
+        }
+    )
+
+    assert settings.profiling_header_enabled is True
+    assert settings.profiling_sample_rate == 0.5
+    assert settings.profiling_container_name == "profiles"
+
+
+def test_settings_from_env_missing():
+    """Test from_env method with missing environment variables."""
+    env = {**ENV, "AZURE_TABLE_NAME": ""}
+    env.pop("AZURE_STORAGE_CONTAINER_NAME")
+
+    with pytest.raises(
+        SettingsError,
+        match="Missing required environment variables: AZURE_STORAGE_CONTAINER_NAME, AZURE_TABLE_NAME",
+    ):
+        Settings.from_env(env=env)
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        ("IMAGE_OPTIMIZATION_FORMAT", "TIFF"),
+        ("IMAGE_OPTIMIZATION_QUALITY", "high"),
+        ("IMAGE_OPTIMIZATION_QUALITY", "²"),
+        ("IMAGE_OPTIMIZATION_QUALITY", "0"),
+        ("IMAGE_OPTIMIZATION_QUALITY", "101"),
+        ("PROFILING_SAMPLE_RATE", "often"),
+        ("PROFILING_SAMPLE_RATE", "101"),
+    ],
+)
+def test_settings_from_env_invalid(name: str, value: str):
+    """Test from_env method with invalid values."""
+    with pytest.raises(SettingsError, match=f"Invalid {name}: {value}"):
+        Settings.from_env(env={**ENV, name: value})
+
+
+def test_get_settings():
+    """Test get_settings function loads the settings once."""
+    settings = get_settings()
+    os_environ["AZURE_TABLE_NAME"] = "other_table_name"
+
+    assert get_settings() is settings
+    assert get_settings().azure_table_name == "table_name"
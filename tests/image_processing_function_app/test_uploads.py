@@ -0,0 +1,267 @@
+from unittest.mock import MagicMock, patch
+from uuid import UUID
+
+import pytest
+from azure.data.tables import TableServiceClient, UpdateMode
+
+from image_processing_function_app.exceptions import ImageProcessingError, UploadError
+from image_processing_function_app.metadata import Metadata
+from image_processing_function_app.uploads import ResumableUpload
+
+UPLOAD_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def resumable_upload() -> ResumableUpload:
+    """Creates a ResumableUpload."""
+    return ResumableUpload(
+        upload_id=UPLOAD_ID,
+        connection_string="connection_string",
+        container_name="container_name",
+    )
+
+
+def initiated_upload() -> ResumableUpload:
+    """Initiates a ResumableUpload with UPLOAD_ID."""
+    with patch("uuid.uuid4", return_value=UUID(UPLOAD_ID)):
+        return ResumableUpload.initiate(
+            connection_string="connection_string",
+            container_name="container_name",
+        )
+
+
+def chunks(data: bytes, chunk_size: int = 1000) -> list[bytes]:
+    """Splits data into chunks."""
+    return [data[i:][:chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def test_initiate(fake_blob_client):
+    """Test initiate method creates a unique upload id and marks its blob."""
+    upload = ResumableUpload.initiate(
+        connection_string="connection_string",
+        container_name="container_name",
+    )
+
+    assert upload.blob_file_name == "uploads/" + upload.upload_id + ".jpg"
+    assert upload.row_key == "uploads-" + upload.upload_id + ".jpg"
+    assert fake_blob_client.data == b""
+    assert fake_blob_client.metadata == {"upload_id": upload.upload_id}
+
+    fake_blob_client.exists = False
+    assert upload.upload_id != ResumableUpload.initiate("", "").upload_id
+
+
+def test_initiate_error(fake_blob_client):
+    """Test initiate method does not replace an existing blob."""
+    fake_blob_client.exists = True
+
+    with pytest.raises(
+        ImageProcessingError, match="Failed to create upload in blob storage."
+    ):
+        ResumableUpload.initiate(
+            connection_string="connection_string",
+            container_name="container_name",
+        )
+
+
+def test_invalid_upload_id():
+    """Test ResumableUpload with invalid upload id."""
+    with pytest.raises(UploadError, match="Invalid upload id: ../other.jpg"):
+        ResumableUpload(
+            upload_id="../other.jpg",
+            connection_string="connection_string",
+            container_name="container_name",
+        )
+
+
+def test_finalize(fake_blob_client, test_image: bytes):
+    """Test chunks are committed in order and metadata is extracted from the
+    header."""
+    upload = initiated_upload()
+    image_chunks = chunks(test_image)
+
+    # Send the chunks out of order, and the second chunk twice
+    for index in reversed(range(len(image_chunks))):
+        upload.append_chunk(index=index, data=image_chunks[index])
+    upload.append_chunk(index=1, data=image_chunks[1])
+    assert upload.staged_chunks() == list(range(len(image_chunks)))
+
+    upload.finalize(chunk_count=len(image_chunks))
+
+    assert fake_blob_client.data == test_image
+    assert upload.original_size == len(test_image)
+    assert upload.metadata == Metadata(
+        make="Python",
+        exif_ifd_pointer="57",
+        gps_ifd_pointer="63",
+    )
+    assert fake_blob_client.metadata == {**upload.metadata_dict, "upload_id": UPLOAD_ID}
+
+    # Test finalizing again, for example when the response was lost
+    upload = resumable_upload()
+    upload.finalize(chunk_count=len(image_chunks))
+    assert fake_blob_client.data == test_image
+    assert upload.original_size == len(test_image)
+
+
+def test_upload_not_initiated(fake_blob_client):
+    """Test an upload that was not initiated is refused."""
+    upload = resumable_upload()
+
+    with pytest.raises(UploadError, match=f"Unknown upload id: {UPLOAD_ID}"):
+        upload.append_chunk(index=0, data=b"example")
+    with pytest.raises(UploadError, match=f"Unknown upload id: {UPLOAD_ID}"):
+        upload.staged_chunks()
+    with pytest.raises(UploadError, match=f"Unknown upload id: {UPLOAD_ID}"):
+        upload.finalize(chunk_count=1)
+    assert fake_blob_client.staged == {}
+    assert not fake_blob_client.exists
+
+
+def test_finalize_existing_blob(fake_blob_client, test_image: bytes):
+    """Test finalize method does not replace an existing blob."""
+    fake_blob_client.upload_blob(
+        data=test_image, blob_type="BlockBlob", metadata={"make": "Python"}
+    )
+    # Test a chunk staged by other means is not committed over the blob
+    fake_blob_client.stage_block(block_id="00000", data=b"example")
+    upload = resumable_upload()
+
+    with pytest.raises(UploadError, match=f"Unknown upload id: {UPLOAD_ID}"):
+        upload.finalize(chunk_count=1)
+    assert fake_blob_client.data == test_image
+    assert fake_blob_client.metadata == {"make": "Python"}
+
+
+def test_finalize_missing_chunks(fake_blob_client, test_image: bytes):
+    """Test finalize method with missing chunks."""
+    upload = initiated_upload()
+    upload.append_chunk(index=0, data=test_image[:1000])
+    upload.append_chunk(index=2, data=test_image[2000:3000])
+
+    with pytest.raises(UploadError, match="Missing chunks: 1, 3"):
+        upload.finalize(chunk_count=4)
+    assert fake_blob_client.data == b""
+
+
+def test_staged_chunks_ignores_other_blocks(fake_blob_client):
+    """Test staged_chunks method ignores blocks that are not chunks."""
+    upload = initiated_upload()
+    upload.append_chunk(index=1, data=b"example")
+    fake_blob_client.stage_block(block_id="²", data=b"example")
+    fake_blob_client.stage_block(block_id="other", data=b"example")
+
+    assert upload.staged_chunks() == [1]
+
+
+def test_finalize_without_metadata(fake_blob_client):
+    """Test finalize method with an image without metadata."""
+    upload = initiated_upload()
+    upload.append_chunk(index=0, data=b"example")
+    upload.finalize(chunk_count=1)
+
+    assert upload.metadata == Metadata(
+        make="Unknown",
+        exif_ifd_pointer="Unknown",
+        gps_ifd_pointer="Unknown",
+    )
+
+
+@pytest.mark.parametrize("index, data", [(-1, b"example"), (50000, b"example")])
+def test_append_chunk_invalid_index(index: int, data: bytes):
+    """Test append_chunk method with invalid index."""
+    with pytest.raises(UploadError, match="Chunk index must be between 0 and 49999."):
+        resumable_upload().append_chunk(index=index, data=data)
+
+
+def test_append_chunk_empty():
+    """Test append_chunk method with empty chunk."""
+    with pytest.raises(UploadError, match="Chunk is empty."):
+        resumable_upload().append_chunk(index=0, data=b"")
+
+
+def test_append_chunk_error(fake_blob_client):
+    """Test append_chunk method with error."""
+    fake_blob_client.stage_block = MagicMock(side_effect=Exception("Went wrong"))
+
+    with pytest.raises(
+        ImageProcessingError, match="Failed to stage chunk in blob storage."
+    ):
+        initiated_upload().append_chunk(index=0, data=b"example")
+
+
+def test_check_initiated_error(fake_blob_client):
+    """Test append_chunk method when the upload cannot be read."""
+    fake_blob_client.get_blob_properties = MagicMock(
+        side_effect=Exception("Went wrong")
+    )
+
+    with pytest.raises(
+        ImageProcessingError, match="Failed to get upload from blob storage."
+    ):
+        resumable_upload().append_chunk(index=0, data=b"example")
+
+
+def test_finalize_error(fake_blob_client):
+    """Test finalize method with error."""
+    fake_blob_client.commit_block_list = MagicMock(side_effect=Exception("Went wrong"))
+    upload = initiated_upload()
+    upload.append_chunk(index=0, data=b"example")
+
+    with pytest.raises(
+        ImageProcessingError, match="Failed to commit image in blob storage."
+    ):
+        upload.finalize(chunk_count=1)
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_insert_table_storage_record(
+    mock_table_service_client: MagicMock,
+    fake_blob_client,
+    test_image: bytes,
+):
+    """Test insert_table_storage_record method."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    upload = initiated_upload()
+    upload.append_chunk(index=0, data=test_image)
+    upload.finalize(chunk_count=1)
+
+    upload.insert_table_storage_record(
+        connection_string="connection_string",
+        table_name="table_name",
+        blob_file_name=UPLOAD_ID + ".jpg",
+        partition_key="PK",
+        row_key="RK",
+    )
+
+    table_client.upsert_entity.assert_called_once_with(
+        entity={
+            "PartitionKey": "PK",
+            "RowKey": "RK",
+            "BlobName": UPLOAD_ID + ".jpg",
+            "OriginalSize": len(test_image),
+            "StoredSize": len(test_image),
+            "make": "Python",
+            "exif_ifd_pointer": "57",
+            "gps_ifd_pointer": "63",
+        },
+        mode=UpdateMode.MERGE,
+    )
+
+
+@patch.object(TableServiceClient, "from_connection_string", return_value=MagicMock())
+def test_insert_table_storage_record_error(mock_table_service_client: MagicMock):
+    """Test insert_table_storage_record method with error."""
+    table_client = mock_table_service_client.return_value.get_table_client.return_value
+    table_client.upsert_entity.side_effect = Exception("Something went wrong")
+
+    with pytest.raises(
+        ImageProcessingError,
+        match="Failed to insert record to table storage.",
+    ):
+        resumable_upload().insert_table_storage_record(
+            connection_string="connection_string",
+            table_name="table_name",
+            blob_file_name=UPLOAD_ID + ".jpg",
+            partition_key="PK",
+            row_key="RK",
+        )
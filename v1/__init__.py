@@ -1,11 +1,12 @@
 import uuid
 from logging import getLogger
-from os import getenv as os_getenv
 
 import azure.functions as func
 
-from image_processing_function_app.exceptions import ImageProcessingError
+from image_processing_function_app.exceptions import ImageProcessingError, SettingsError
 from image_processing_function_app.processing import ImageProcessingFunctionRequest
+from image_processing_function_app.profiling import get_profiler
+from image_processing_function_app.settings import get_settings
 
 LOGGER = getLogger(__name__)
 
@@ -14,47 +15,73 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
 
     LOGGER.info("Python HTTP trigger function processed a request.")
 
-    # Set environment variables for Azure Storage
-    azure_storage_connection_string = os_getenv("AZURE_STORAGE_CONNECTION_STRING")
-    azure_storage_container_name = os_getenv("AZURE_STORAGE_CONTAINER_NAME")
-
-    # Set environment variables for Azure Table Storage
-    azure_table_connection_string = os_getenv("AZURE_TABLE_CONNECTION_STRING")
-    azure_table_name = os_getenv("AZURE_TABLE_NAME")
-    azure_table_partition_key = os_getenv("AZURE_TABLE_PARTITION_KEY")
+    # Load settings, these are read from the environment once per worker
+    try:
+        settings = get_settings()
+    except SettingsError as e:
+        LOGGER.error(f"Invalid settings: {e}")
+        return func.HttpResponse(
+            "Error occurred while processing image",
+            status_code=500,
+        )
 
     # Generate a unique blob name
     blob_name = uuid.uuid4()
-    blob_file_name = str(blob_name) + ".jpg"
 
-    # Create an instance of ImageProcessingFunctionRequest
-    img_proc_func_request = ImageProcessingFunctionRequest.from_http_request(
-        req=req,
+    # Profile the invocation when it is sampled
+    with get_profiler(
+        headers=req.headers,
+        settings=settings,
+        name=str(blob_name),
         logger=LOGGER,
-    )
+    ) as profiler:
 
-    try:
-        # Upload image to blob storage
-        img_proc_func_request.upload_to_blob_storage(
-            connection_string=str(azure_storage_connection_string),
-            container_name=str(azure_storage_container_name),
-            blob_file_name=str(blob_file_name),
-        )
+        # Create an instance of ImageProcessingFunctionRequest
+        with profiler.stage("metadata"):
+            img_proc_func_request = ImageProcessingFunctionRequest.from_http_request(
+                req=req,
+                logger=LOGGER,
+            )
 
-        # Insert record into table storage
-        img_proc_func_request.insert_table_storage_record(
-            connection_string=str(azure_table_connection_string),
-            table_name=str(azure_table_name),
-            blob_file_name=str(blob_file_name),
-            partition_key=str(azure_table_partition_key),
-            row_key=str(blob_file_name),
-        )
+        # Compute the perceptual hash of the original image
+        with profiler.stage("hash"):
+            img_proc_func_request.compute_perceptual_hash()
 
-    except ImageProcessingError:
-        return func.HttpResponse(
-            "Error occurred while processing image",
-            status_code=500,
-        )
+        # Optimize image before it is stored
+        if settings.image_optimization_enabled:
+            with profiler.stage("optimization"):
+                img_proc_func_request.optimize_image(
+                    image_format=settings.image_optimization_format,
+                    quality=settings.image_optimization_quality,
+                )
+
+        blob_file_name = str(blob_name) + img_proc_func_request.file_extension
+
+        try:
+            # Upload image to blob storage
+            with profiler.stage("upload"):
+                img_proc_func_request.upload_to_blob_storage(
+                    connection_string=settings.azure_storage_connection_string,
+                    container_name=settings.azure_storage_container_name,
+                    blob_file_name=blob_file_name,
+                )
+
+            # Insert record into table storage
+            with profiler.stage("table"):
+                img_proc_func_request.insert_table_storage_record(
+                    connection_string=settings.azure_table_connection_string,
+                    table_name=settings.azure_table_name,
+                    blob_file_name=blob_file_name,
+                    partition_key=settings.azure_table_partition_key,
+                    row_key=blob_file_name,
+                    batched=settings.azure_table_batch_writes,
+                )
+
+        except ImageProcessingError:
+            return func.HttpResponse(
+                "Error occurred while processing image",
+                status_code=500,
+            )
 
     LOGGER.info("Image processing function completed successfully.")
 
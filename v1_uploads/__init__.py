@@ -0,0 +1,116 @@
+import json
+from logging import getLogger
+
+import azure.functions as func
+
+from image_processing_function_app.exceptions import (
+    ImageProcessingError,
+    SettingsError,
+    UploadError,
+)
+from image_processing_function_app.settings import get_settings
+from image_processing_function_app.uploads import ResumableUpload
+
+LOGGER = getLogger(__name__)
+
+
+def json_response(body: dict, status_code: int = 200) -> func.HttpResponse:
+    """Returns an HTTP response with a JSON body."""
+    return func.HttpResponse(
+        json.dumps(body),
+        status_code=status_code,
+        mimetype="application/json",
+    )
+
+
+def main(req: func.HttpRequest) -> func.HttpResponse:
+    """Resumable upload of an image in chunks.
+
+    Routes:
+        - POST /api/v1/uploads starts an upload.
+        - PUT /api/v1/uploads/{upload_id}/chunks/{index} stages a chunk.
+        - GET /api/v1/uploads/{upload_id} lists the staged chunks.
+        - POST /api/v1/uploads/{upload_id}/finalize?chunks=N stores chunks 0 to N-1 as the image.
+    """
+
+    LOGGER.info("Python HTTP trigger function processed a resumable upload request.")
+
+    # Load settings, these are read from the environment once per worker
+    try:
+        settings = get_settings()
+    except SettingsError as e:
+        LOGGER.error(f"Invalid settings: {e}")
+        return func.HttpResponse(
+            "Error occurred while processing image",
+            status_code=500,
+        )
+
+    upload_id = req.route_params.get("upload_id")
+    action = req.route_params.get("action")
+    index = req.route_params.get("index")
+
+    try:
+        # Start a new upload
+        if upload_id is None:
+            if req.method != "POST":
+                return func.HttpResponse("Method not allowed", status_code=405)
+            upload = ResumableUpload.initiate(
+                connection_string=settings.azure_storage_connection_string,
+                container_name=settings.azure_storage_container_name,
+                logger=LOGGER,
+            )
+            return json_response({"upload_id": upload.upload_id}, status_code=201)
+
+        upload = ResumableUpload(
+            upload_id=upload_id,
+            connection_string=settings.azure_storage_connection_string,
+            container_name=settings.azure_storage_container_name,
+            logger=LOGGER,
+        )
+
+        # List the staged chunks, so a client can resume the upload
+        if action is None and index is None and req.method == "GET":
+            return json_response(
+                {"upload_id": upload.upload_id, "chunks": upload.staged_chunks()}
+            )
+
+        # Stage a chunk
+        if action == "chunks" and index is not None and req.method == "PUT":
+            if not index.isdecimal():
+                raise UploadError(f"Invalid chunk index: {index}")
+            upload.append_chunk(index=int(index), data=req.get_body())
+            return json_response({"upload_id": upload.upload_id, "chunk": int(index)})
+
+        # Commit the chunks and insert the record into table storage
+        if action == "finalize" and index is None and req.method == "POST":
+            chunk_count = req.params.get("chunks", "")
+            if not chunk_count.isdecimal():
+                raise UploadError(f"Invalid chunk count: {chunk_count}")
+            upload.finalize(chunk_count=int(chunk_count))
+            upload.insert_table_storage_record(
+                connection_string=settings.azure_table_connection_string,
+                table_name=settings.azure_table_name,
+                blob_file_name=upload.blob_file_name,
+                partition_key=settings.azure_table_partition_key,
+                row_key=upload.row_key,
+                batched=settings.azure_table_batch_writes,
+            )
+            LOGGER.info("Resumable upload completed successfully.")
+            return json_response(
+                {
+                    "upload_id": upload.upload_id,
+                    "blob_name": upload.blob_file_name,
+                    "size": upload.original_size,
+                }
+            )
+
+    except UploadError as e:
+        return func.HttpResponse(str(e), status_code=400)
+
+    except ImageProcessingError:
+        return func.HttpResponse(
+            "Error occurred while processing image",
+            status_code=500,
+        )
+
+    return func.HttpResponse("Not found", status_code=404)